@@ -1 +1,5 @@
-from ._differentialevolution import differential_evolution
+from ._differentialevolution import (differential_evolution,
+                                      DifferentialEvolutionSolver)
+from ._batch import differential_evolution_batch
+from ._islands import differential_evolution_islands
+from ._backends import Backend, NumpyBackend, PyCUDABackend
@@ -0,0 +1,112 @@
+"""
+Array backends: how the parameters of the population are handed to the
+objective function.
+
+A backend allocates the arrays passed to the objective function, copies the
+scaled parameters from the host into them, and brings the energies returned
+by the objective function back to the host.
+"""
+from __future__ import division, print_function, absolute_import
+import numpy as np
+
+try:
+    import pycuda.gpuarray as garray
+    import pycuda.driver as gdrv
+except ImportError:
+    garray = None
+    gdrv = None
+
+__all__ = ['Backend', 'NumpyBackend', 'PyCUDABackend']
+
+
+class Backend(object):
+    """
+    Base class of the array backends.
+
+    Subclasses implement `allocate`, `to_device` and `to_host`. A backend that
+    can hand host arrays to the objective function directly sets `zero_copy`
+    to True; the solver then passes views of its parameter buffer instead of
+    allocating and filling device arrays.
+    """
+    zero_copy = False
+
+    def allocate(self, size, dtype):
+        """
+        allocate a 1-D device array with `size` elements of type `dtype`.
+        """
+        raise NotImplementedError
+
+    def to_device(self, dest, src):
+        """
+        copy the host array `src` into the device array `dest` of the same
+        shape, in a single transfer.
+        """
+        raise NotImplementedError
+
+    def to_host(self, array):
+        """
+        return the device array `array` as a numpy array.
+        """
+        raise NotImplementedError
+
+
+class NumpyBackend(Backend):
+    """
+    Backend for objective functions that operate on numpy arrays. The
+    objective function receives views of the solver's parameter buffer, so
+    no copy is made.
+    """
+    zero_copy = True
+
+    def allocate(self, size, dtype):
+        return np.zeros(size, dtype=dtype)
+
+    def to_device(self, dest, src):
+        np.copyto(dest, src)
+
+    def to_host(self, array):
+        return np.asarray(array)
+
+
+class PyCUDABackend(Backend):
+    """
+    Backend for objective functions that operate on PyCUDA arrays.
+    """
+    def __init__(self):
+        if garray is None:
+            raise ImportError("The 'pycuda' backend requires PyCUDA")
+
+    def allocate(self, size, dtype):
+        return garray.zeros(size, dtype=dtype)
+
+    def to_device(self, dest, src):
+        order = 'F' if dest.flags.f_contiguous else 'C'
+        src = np.asarray(src, dtype=dest.dtype, order=order)
+        gdrv.memcpy_htod(dest.gpudata, src)
+
+    def to_host(self, array):
+        if isinstance(array, garray.GPUArray):
+            return array.get()
+        return np.asarray(array)
+
+
+_backends = {'numpy': NumpyBackend,
+             'pycuda': PyCUDABackend}
+
+
+def _make_backend(backend):
+    """Turn backend into a Backend instance
+    If backend is None, return a PyCUDA backend if PyCUDA is available, or a
+    numpy backend otherwise.
+    If backend is a string, return a new instance of the named backend.
+    If backend is already a Backend instance, return it.
+    Otherwise raise ValueError.
+    """
+    if backend is None:
+        backend = 'numpy' if garray is None else 'pycuda'
+    if isinstance(backend, Backend):
+        return backend
+    if backend in _backends:
+        return _backends[backend]()
+    raise ValueError("The backend must be a Backend instance or one of %s"
+                     % ", ".join(sorted(_backends)))
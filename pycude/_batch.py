@@ -0,0 +1,267 @@
+"""
+differential_evolution_batch: many independent differential evolution
+problems solved in the same evaluation calls.
+
+The populations of all the problems are stacked into a single population, so
+that each generation of every problem still unsolved is evaluated in a single
+call of the objective function.
+"""
+from __future__ import division, print_function, absolute_import
+import numpy as np
+from scipy.optimize import OptimizeResult
+
+from ._differentialevolution import (DifferentialEvolutionSolver,
+                                     _status_message, _MACHEPS, _integers)
+
+__all__ = ['differential_evolution_batch']
+
+
+def differential_evolution_batch(func, bounds, n_problems, args=(),
+                                 strategy='best1bin', maxiter=None, popsize=0,
+                                 popscale=15, tol=0.01, mutation=(0.5, 1),
+                                 recombination=0.7, seed=None, disp=False,
+                                 init='latinhypercube',
+                                 bounds_handling='random', backend=None,
+                                 layout='columns', order='F',
+                                 dtype=np.float64):
+    """Finds the global minima of many independent problems at once.
+
+    Each of the `n_problems` problems is solved by differential evolution with
+    its own population, but the trials of all the problems are evaluated in a
+    single call of `func` per generation. A problem is retired from the
+    evaluations once its population has converged.
+
+    Parameters
+    ----------
+    func : callable
+        The wrapper for parallel invocation of the objective function to be
+        minimized.  Must be in the form ``F(X, problem, *args)``, where ``X``
+        is the argument as described in `differential_evolution`, and
+        ``problem`` is an integer numpy array giving, for each candidate in
+        ``X``, the index of the problem it belongs to.
+    bounds : sequence
+        Bounds for variables, shared by all the problems. See
+        `differential_evolution`.
+    n_problems : int
+        The number of problems.
+    maxiter : int, optional
+        The maximum number of generations over which the population of each
+        problem is evolved.
+    popsize : int, optional
+        Population size of each problem. If zero, the population size is set
+        with ``popscale``.
+    tol : float, optional
+        The population of a problem has converged when the standard deviation
+        of its energies, divided by the mean of its energies, is less than
+        `tol`.
+
+    The other parameters are as in `differential_evolution`.
+
+    Returns
+    -------
+    res : OptimizeResult
+        The optimization result represented as a ``OptimizeResult`` object,
+        with one entry for each problem in ``x`` (of shape
+        ``(n_problems, len(bounds))``), ``fun``, ``nit`` and ``success``.
+        ``nfev`` is the total number of function evaluations.
+    """
+    solver = BatchDifferentialEvolutionSolver(func, bounds, n_problems,
+                                              args=args, strategy=strategy,
+                                              maxiter=maxiter, popsize=popsize,
+                                              popscale=popscale, tol=tol,
+                                              mutation=mutation,
+                                              recombination=recombination,
+                                              seed=seed, disp=disp, init=init,
+                                              bounds_handling=bounds_handling,
+                                              backend=backend, layout=layout,
+                                              order=order, dtype=dtype)
+    return solver.solve()
+
+
+class BatchDifferentialEvolutionSolver(DifferentialEvolutionSolver):
+    """
+    The population holds the populations of all the problems one after the
+    other: the members of the i-th problem are the rows
+    ``i * num_population_members`` to ``(i + 1) * num_population_members``,
+    the first of which is the best solution of the problem.
+    """
+
+    def __init__(self, func, bounds, n_problems, args=(), **kwargs):
+        if kwargs.get('init') == 'opposition':
+            raise ValueError("The 'opposition' initialization is not "
+                             "supported in batch")
+        self.n_problems = n_problems
+        super(BatchDifferentialEvolutionSolver, self).__init__(
+            func, bounds, args=args, **kwargs)
+
+    def init_population_lhs(self):
+        """
+        Initializes the population of each problem with Latin Hypercube
+        Sampling.
+        """
+        self._init_population_blocks(
+            super(BatchDifferentialEvolutionSolver, self).init_population_lhs)
+
+    def init_population_random(self):
+        """
+        Initializes the population of each problem at random.
+        """
+        self._init_population_blocks(
+            super(BatchDifferentialEvolutionSolver, self).init_population_random)
+
+    def init_population_sobol(self):
+        """
+        Initializes the population of each problem with a scrambled Sobol'
+        sequence.
+        """
+        self._init_population_blocks(
+            super(BatchDifferentialEvolutionSolver, self).init_population_sobol)
+
+    def init_population_halton(self):
+        """
+        Initializes the population of each problem with a scrambled Halton
+        sequence.
+        """
+        self._init_population_blocks(
+            super(BatchDifferentialEvolutionSolver, self).init_population_halton)
+
+    def _init_population_blocks(self, init_population):
+        # each problem is initialized in place, in its own block.
+        size = self.num_population_members
+        population = np.empty((self.n_problems * size, self.parameter_count),
+                              self.dtype)
+        for problem in range(self.n_problems):
+            self.population = population[problem * size:
+                                         (problem + 1) * size]
+            init_population()
+        self.population = population
+
+    @property
+    def x(self):
+        """
+        The best solution of each problem.
+        """
+        return self._scale_parameters(
+            self.population[::self.num_population_members])
+
+    def solve(self):
+        """
+        Runs the BatchDifferentialEvolutionSolver.
+        Returns
+        -------
+        res : OptimizeResult
+            The optimization result represented as a ``OptimizeResult``
+            object, with one entry for each problem in ``x``, ``fun``, ``nit``
+            and ``success``.
+        """
+        size = self.num_population_members
+        problem_index = np.arange(len(self.population)) // size
+
+        # calculate energies to start with
+        parameters = np.zeros_like(self.population, order='F')
+        parameters[:] = self._scale_parameters(self.population)
+
+        self.population_energies[:] = self.evaluate_func(
+            parameters, (problem_index,) + self.args)
+        nfev = len(self.population)
+
+        problems = np.arange(self.n_problems)
+        self._swap_best_blocks(problems)
+
+        nit = np.zeros(self.n_problems, dtype=int)
+        converged = np.zeros(self.n_problems, dtype=bool)
+
+        # do the optimisation.
+        trials = np.zeros_like(self.population, order='F')
+        for step in range(1, self.maxiter + 1):
+            # the members of the problems still running.
+            candidates = (problems[:, np.newaxis] * size
+                          + np.arange(size)).ravel()
+            num_candidates = len(candidates)
+
+            self._update_scale()
+            self._make_trials(candidates, trials[:num_candidates],
+                              parameters[:num_candidates])
+
+            energies = self.evaluate_func(
+                parameters[:num_candidates],
+                (problem_index[candidates],) + self.args)
+            nfev += num_candidates
+
+            self._replace(candidates, trials[:num_candidates], energies)
+            self._swap_best_blocks(problems)
+            nit[problems] = step
+
+            # retire the problems whose population has converged
+            energies = self.population_energies.reshape(-1, size)[problems]
+            convergence = (np.std(energies, axis=1) /
+                           np.abs(np.mean(energies, axis=1) + _MACHEPS))
+            converged[problems] = convergence < self.tol
+            problems = problems[~converged[problems]]
+
+            if self.disp:
+                print("differential_evolution_batch step %d: %d problems "
+                      "remaining" % (step, len(problems)))
+
+            if not len(problems):
+                status_message = _status_message['success']
+                break
+        else:
+            status_message = _status_message['maxiter']
+
+        return OptimizeResult(
+            x=self.x,
+            fun=self.population_energies[::size].copy(),
+            nfev=nfev,
+            nit=nit,
+            message=status_message,
+            success=converged)
+
+    def _best(self, candidates):
+        """
+        the best solution of the problem of each of the `candidates`.
+        """
+        return self.population[candidates
+                               - candidates % self.num_population_members]
+
+    def _select_samples(self, candidates, number_samples):
+        """
+        obtain random integers from the members of the problem of each of the
+        `candidates`, without replacement. You can't have the original
+        candidate either.
+        """
+        size = self.num_population_members
+        samples = super(BatchDifferentialEvolutionSolver,
+                        self)._select_samples(candidates % size,
+                                              number_samples)
+        return samples + (candidates - candidates % size)
+
+    def _swap_best_blocks(self, problems):
+        """
+        put the best solution of each of the `problems` into its best solution
+        position.
+        """
+        size = self.num_population_members
+        energies = self.population_energies.reshape(-1, size)[problems]
+        first = problems * size
+        best = first + np.argmin(energies, axis=1)
+
+        rows = np.concatenate((first, best))
+        swapped = np.concatenate((best, first))
+        self.population_energies[rows] = self.population_energies[swapped]
+        self.population[rows] = self.population[swapped]
+
+    def _pbest(self, candidates):
+        """
+        a solution drawn from the `pbest` fraction of the best solutions of
+        the problem of each of the `candidates`.
+        """
+        rng = self.random_number_generator
+        size = self.num_population_members
+        count = max(1, int(round(self.pbest * size)))
+        energies = self.population_energies.reshape(-1, size)
+        best = np.argpartition(energies, count - 1, axis=1)[:, :count]
+
+        problems = candidates // size
+        choices = best[problems, _integers(rng, 0, count, len(candidates))]
+        return self.population[problems * size + choices]
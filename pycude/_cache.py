@@ -0,0 +1,71 @@
+"""
+Cache of the energies of evaluated parameter vectors.
+"""
+from __future__ import division, print_function, absolute_import
+from collections import OrderedDict
+
+import numpy as np
+
+__all__ = []
+
+
+class _EnergyCache(object):
+    """
+    Least recently used cache of energies, keyed by parameter vectors
+    quantized to a tolerance `tol`: two vectors share an entry if each of
+    their parameters rounds to the same multiple of `tol`. With a `tol` of
+    zero, only identical vectors share an entry. At most `maxsize` entries are
+    kept.
+    """
+    def __init__(self, tol, maxsize):
+        if tol < 0:
+            raise ValueError('The cache tolerance must be non-negative')
+        if maxsize < 1:
+            raise ValueError('The cache size must be positive')
+        self.tol = tol
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._energies = OrderedDict()
+
+    def keys(self, parameters):
+        """
+        the keys of the rows of `parameters`.
+        """
+        if self.tol:
+            quantized = np.round(parameters / self.tol).astype(np.int64)
+        else:
+            quantized = np.asarray(parameters, dtype=np.float64)
+        quantized = np.ascontiguousarray(quantized)
+        rows = quantized.view(np.dtype((np.void, quantized.strides[0])))
+        return rows.ravel().tolist()
+
+    def lookup(self, keys):
+        """
+        the cached energies of `keys`, and whether each of them was found.
+        The energies of the keys not found are undefined, as the cached
+        energies may be NaN.
+        """
+        energies = np.empty(len(keys))
+        found = np.zeros(len(keys), dtype=bool)
+        for index, key in enumerate(keys):
+            energy = self._energies.get(key)
+            if energy is not None:
+                self._energies.move_to_end(key)
+                energies[index] = energy
+                found[index] = True
+        hits = np.count_nonzero(found)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return energies, found
+
+    def update(self, keys, energies):
+        """
+        cache `energies` for `keys`, evicting the least recently used entries
+        beyond `maxsize`.
+        """
+        for key, energy in zip(keys, energies):
+            self._energies[key] = float(energy)
+            self._energies.move_to_end(key)
+        while len(self._energies) > self.maxsize:
+            self._energies.popitem(last=False)
@@ -6,23 +6,63 @@ This file is largely (shamelessly) based on the Scipy's implementation of DE.
 from __future__ import division, print_function, absolute_import
 import numpy as np
 from scipy.optimize import OptimizeResult
-from scipy.optimize.optimize import _status_message
+try:
+    from scipy.stats import qmc
+except ImportError:
+    qmc = None
+try:
+    from scipy.optimize._optimize import _status_message
+except ImportError:
+    from scipy.optimize.optimize import _status_message
 import numbers
+import json
+import os
+import tempfile
+from timeit import default_timer
+from concurrent.futures import (Future, ThreadPoolExecutor, wait,
+                                FIRST_COMPLETED)
+
+from ._backends import _make_backend, NumpyBackend
+from ._parallel import _PoolEvaluator
+from ._cache import _EnergyCache
+from ._profiling import _Timer, _NullTimer
+from ._polish import _POLISH_METHODS
+from ._surrogate import _Surrogate
+
+__all__ = ['differential_evolution', 'DifferentialEvolutionSolver']
 
-try:
-    import pycuda.gpuarray as garray
-    import pycuda.driver as gdrv
-except:
-    pass
+_MACHEPS = np.finfo(np.float64).eps
 
-__all__ = ['differential_evolution']
+# The chunk sizes tried by ``max_batch='auto'`` grow from the smallest up to
+# the largest, and the smallest one whose throughput is within the tolerance
+# of the best one is kept.
+_AUTO_BATCH_MIN = 1024
+_AUTO_BATCH_MAX = 2 ** 20
+_AUTO_BATCH_TOLERANCE = 0.1
 
-_MACHEPS = np.finfo(np.float64).eps
+# The number of values of the population initialized at once, which bounds the
+# temporary arrays of the initialization.
+_INIT_CHUNK_SIZE = 2 ** 20
 
 def differential_evolution(func, bounds, x0=None, args=(), strategy='best1bin',
                            maxiter=None, popsize=0, popscale=15, tol=0.01,
                            mutation=(0.5, 1), recombination=0.7, seed=None,
-                           callbacks=None, earlystop=None, disp=False, polish=False, init='latinhypercube'):
+                           callbacks=None, earlystop=None, disp=False, polish=False, init='latinhypercube',
+                           bounds_handling='random', backend=None,
+                           layout='columns', order='F', pipeline=False,
+                           workers=1, cache_tol=None, cache_size=100000,
+                           checkpoint_path=None, checkpoint_every=10,
+                           resume=None, adaptive=False, memory_size=5,
+                           pbest=0.1, archive=False, max_nfev=None,
+                           population_reduction=None, min_popsize=0,
+                           profile=False, polish_top_k=1, polish_maxiter=100,
+                           asynchronous=False, max_inflight=0,
+                           dtype=np.float64, max_batch=None, memmap=None,
+                           constraints=None, surrogate=None,
+                           surrogate_fraction=0.25, surrogate_explore=0.05,
+                           surrogate_size=1000, target=None, max_time=None,
+                           stagnation=0, restarts=0, popsize_growth=2,
+                           integrality=None):
     """Finds the global minimum of a multivariate function.
     This implementation is largely based on Scipy's implementation of DE.
 
@@ -31,11 +71,14 @@ def differential_evolution(func, bounds, x0=None, args=(), strategy='best1bin',
     func : callable
         The wrapper for parallel invocation of the objective function to be
         minimized.  Must be in the form ``F(X, *args)``, where ``X`` is the
-        argument in the form of a tuple of PyCUDA arrays and ``args`` is a
-        tuple of any additional fixed parameters needed to completely specify
-        the function. The objective function must be in the form ``f(x, *arg)``,
-        where ``x`` is the argument taken from the i-th element from each
-        arrays in ``X``, i.e. ``x = (X[0][i], ..., X[N][i])``.
+        argument in the form of a list of arrays of the `backend`, one for
+        each parameter, and ``args`` is a tuple of any additional fixed
+        parameters needed to completely specify the function. The objective
+        function must be in the form ``f(x, *arg)``, where ``x`` is the
+        argument taken from the i-th element from each arrays in ``X``, i.e.
+        ``x = (X[0][i], ..., X[N][i])``. See `layout` for passing ``X`` as a
+        single matrix instead. If `workers` is not 1, `func` is the objective
+        function ``f(x, *args)`` itself, where ``x`` is a 1-D numpy array.
     bounds : sequence
         Bounds for variables.  ``(min, max)`` pairs for each element in ``x``,
         defining the lower and upper bounds for the optimizing argument of
@@ -59,6 +102,8 @@ def differential_evolution(func, bounds, x0=None, args=(), strategy='best1bin',
             - 'best2bin'
             - 'rand2bin'
             - 'rand1bin'
+            - 'currenttopbest1bin'
+            - 'currenttopbest1exp'
         The default is 'best1bin'
     maxiter : int, optional
         The maximum number of generations over which the entire population is
@@ -90,14 +135,16 @@ def differential_evolution(func, bounds, x0=None, args=(), strategy='best1bin',
         denoted by CR. Increasing this value allows a larger number of mutants
         to progress into the next generation, but at the risk of population
         stability.
-    seed : int or `np.random.RandomState`, optional
+    seed : int, SeedSequence, Generator or RandomState, optional
         If `seed` is not specified the `np.random.RandomState` singleton is
         used.
-        If `seed` is an int, a new `np.random.RandomState` instance is used,
-        seeded with `seed`.
-        If `seed` is already a `np.random.RandomState` instance, then that
-        `np.random.RandomState` instance is used.
-        Specify `seed` for repeatable minimizations.
+        If `seed` is an int or a `np.random.SeedSequence`, a new
+        `np.random.Generator` instance (PCG64) is used, seeded with `seed`.
+        If `seed` is already a `np.random.Generator` or
+        `np.random.RandomState` instance, then that instance is used, e.g. a
+        Generator of another bit generator such as Philox.
+        Specify `seed` for repeatable minimizations. The random numbers of a
+        generation are drawn in bulk.
     disp : bool, optional
         Display status messages
     earlystop : callable, `earlystop(xk, convergence=val)`, optional
@@ -113,46 +160,363 @@ def differential_evolution(func, bounds, x0=None, args=(), strategy='best1bin',
         solution with the lowest ``cost``. Note adding keyword arguments to the
         signature of a callback will avoid 'unexpected argument' error, i.e
         ``callback(..., **kwargs)``.
-    polish : bool, optional
-        If True, then `scipy.optimize.minimize` with the `L-BFGS-B` method
-        is used to polish the best population member at the end. This requires
-        a few more function evaluations.
+    polish : bool or str, optional
+        If given, the `polish_top_k` best population members are refined
+        together at the end by a local search, whose probes of all the members
+        are evaluated in a single call of `func` per step. Should be one of:
+            - 'gradient': projected steepest descent, with the gradients
+              estimated by central differences (2 * len(x) points per member
+              in one call), followed by a search over 8 step lengths along
+              each descent direction (in another call)
+            - 'pattern': compass search, polling the 2 * len(x) points one
+              step away from each member along each parameter (in one call)
+        True is the same as 'gradient'. This requires a few more function
+        evaluations.
     init : string, optional
         Specify which type of population initialization is performed. Should be
         one of:
             - 'latinhypercube'
             - 'random'
+            - 'sobol': a scrambled Sobol' sequence
+            - 'halton': a scrambled Halton sequence
+            - 'opposition': Latin Hypercube Sampling, and the opposite of
+              each member within the bounds, of which the best `popsize`
+              members are kept after evaluating both in a single call,
+              or in chunks of at most `max_batch` members
+        The quasi-random sequences cover the parameter space more evenly.
+    bounds_handling : string, optional
+        Specify how the parameters of a trial vector that fall outside of the
+        bounds are brought back in. Should be one of:
+            - 'random': re-initialized uniformly at random within the bounds
+            - 'clip': set to the violated bound
+            - 'reflect': reflected back into the bounds at the violated bound
+            - 'midpoint': set to the midpoint between the parent and the
+              violated bound
+            - 'wrap': wrapped around to the opposite bound
+        The default is 'random'. 'reflect' and 'midpoint' tend to converge
+        faster when the optimum lies close to a bound.
+    backend : string or `Backend`, optional
+        The array backend used to hand the parameters to `func`. Should be one
+        of:
+            - 'pycuda': ``X`` is a list of PyCUDA arrays
+            - 'numpy': ``X`` is a list of numpy arrays, which are views of the
+              solver's parameter buffer
+        or an instance of a `Backend` subclass. If not specified, 'pycuda' is
+        used when PyCUDA is available, and 'numpy' otherwise.
+    layout : string, optional
+        How the parameters are passed to `func`. Should be one of:
+            - 'columns': ``X`` is a list of 1-D arrays, one for each parameter
+            - 'matrix': ``X`` is a single 2-D array of shape
+              ``(popsize, len(x))``, i.e. ``x = X[i]``
+        With 'matrix', the parameters of the whole population are copied to
+        the backend in a single transfer, instead of one for each parameter.
+    order : {'F', 'C'}, optional
+        The memory layout of ``X`` when `layout` is 'matrix': column-major
+        ('F', the default) or row-major ('C'). The parameters are kept
+        column-major on the host, so 'F' avoids a transposition before the
+        transfer, and the numpy backend passes the host buffer itself.
+    pipeline : bool, optional
+        If True, the population is split into two halves that are evolved
+        alternately: the trials of one half are created on a background
+        thread while the trials of the other half are being evaluated. Each
+        half is then evolved from the population as it was before the
+        selection of the other half, which in practice affects the
+        convergence little, but keeps both the host and `func` busy.
+    workers : int, optional
+        If not 1, `func` is a scalar objective function ``f(x, *args)`` that
+        is evaluated on the population across a pool of `workers` processes
+        (-1 uses all the available CPU cores). The parameters are handed to
+        the processes in shared memory, and `func` and `args` must be
+        picklable. The default is 1, in which case `func` evaluates the whole
+        population in a single call.
+    cache_tol : float, optional
+        If given, the energies of the evaluated parameter vectors are cached,
+        and the trials whose parameters all round to the same multiples of
+        `cache_tol` as a cached vector are not passed to `func` again, but
+        take the cached energy. A `cache_tol` of zero only matches identical
+        vectors. The numbers of cache hits and misses are reported as
+        ``cache_hits`` and ``cache_misses`` in the result.
+    cache_size : int, optional
+        The maximum number of parameter vectors in the cache, beyond which the
+        least recently used ones are evicted. Each one takes about
+        ``8 * len(x)`` bytes plus a fixed overhead of about 150 bytes.
+    checkpoint_path : str, optional
+        If given, the state of the solver is saved to this ``.npz`` file every
+        `checkpoint_every` generations, so that the minimization can be
+        resumed with `resume`. The file is replaced atomically, so a
+        preempted run always leaves a complete checkpoint behind.
+    checkpoint_every : int, optional
+        The number of generations between checkpoints.
+    resume : str, optional
+        A checkpoint saved with `checkpoint_path` from which the minimization
+        is resumed. The other arguments should be the same as those of the
+        checkpointed run; the minimization then continues exactly as it
+        would have without interruption.
+    adaptive : bool, optional
+        If True, the mutation constant and the recombination constant are
+        drawn for each trial, from distributions adapted to the values that
+        produced improvements in the previous generations (SHADE). The
+        mutation constant is drawn from a Cauchy distribution, and the
+        recombination constant from a normal distribution, centred on a
+        memory entry picked at random. `mutation` (or the middle of its
+        range, when dithering) and `recombination` initialize the memory.
+    memory_size : int, optional
+        The number of entries in the memory of successful mutation and
+        recombination constants, when `adaptive`.
+    pbest : float, optional
+        The fraction of the population, ranked by energy, from which the best
+        member is drawn by the 'currenttopbest1' strategies.
+    archive : bool, optional
+        If True, the parents replaced by their trials are kept in an archive
+        of the size of the population, and the second difference vector of
+        the 'currenttopbest1' strategies is drawn from the population and the
+        archive.
+    max_nfev : int, optional
+        If given, the maximum number of function evaluations, after which the
+        minimization stops. The trials past it are discarded without being
+        evaluated, so that the budget is never exceeded, except by the
+        polishing.
+    population_reduction : str, optional
+        If given, the population is shrunk from `popsize` down to
+        `min_popsize` in the course of the minimization, by dropping its worst
+        members. Should be one of:
+            - 'linear': the population size decreases linearly with the
+              number of function evaluations, reaching `min_popsize` at
+              `max_nfev`, or at ``(maxiter + 1) * popsize`` evaluations by
+              default (L-SHADE)
+            - 'convergence': the population size decreases with the progress
+              of the convergence measure towards `tol`
+    min_popsize : int, optional
+        The final population size of `population_reduction`. If zero, the
+        smallest population size the strategy allows (and at least 4) is
+        used.
+    profile : bool or callable, optional
+        If True, the time spent in each phase of every generation is measured:
+        'mutation', 'bounds', 'scaling', 'cache', 'transfer' (to the
+        backend), 'evaluation' (by `func`, including the retrieval of the
+        energies), 'constraints', 'surrogate', 'selection', 'migration' (of
+        the islands), 'callbacks' and 'checkpoint', along with the wall-clock time of the whole generation
+        as 'total'. The records of the generations, starting with the initial
+        evaluation as step 0, are returned as ``timings``, and their sums as
+        ``timing_totals`` in the result. If a callable, it is also called
+        with ``profile(step=i, record=r)`` at the end of each generation,
+        where ``record`` is the dict of the generation. The phases overlap in
+        pipelined mode.
+    polish_top_k : int, optional
+        The number of the best population members refined by `polish`.
+    polish_maxiter : int, optional
+        The maximum number of steps of the local search of `polish`.
+    asynchronous : bool, optional
+        If True, with `workers` other than 1, the population is evolved in a
+        steady state instead of generation by generation: a trial is created
+        from the current population whenever a worker is free, and is
+        selected against its parent as soon as its energy is returned, so
+        that no worker waits for the slowest evaluation of a generation. The
+        convergence, the callbacks and the checkpoints are still handled every
+        `popsize` evaluations, which count as a generation. The minimization
+        is then not reproducible with `seed`, and `pipeline`, `cache_tol`
+        and `surrogate` are ignored.
+    max_inflight : int, optional
+        The maximum number of trials being evaluated at once when
+        `asynchronous`. If zero, the number of workers is used.
+    dtype : {np.float64, np.float32}, optional
+        The precision of the population, of the trials, and of the parameters
+        passed to `func`. With np.float32, the memory of the population and
+        of the backend arrays, and the volume of the transfers, are halved for
+        objective functions computed in single precision. The energies and
+        the convergence statistics are always double precision.
+    max_batch : int or 'auto', optional
+        If given, the trials of each generation are created, evaluated and
+        selected in chunks of at most `max_batch` members, through backend
+        arrays and host buffers of that many rows, so that the population
+        size is not limited by the device memory. With 'auto', the initial
+        population is evaluated in chunks of growing sizes, and the smallest
+        size within 10% of the best measured throughput is kept. The members
+        of the later chunks of a generation may be drawn from the members
+        already selected in the same generation. When pipelined, the trials
+        of the next chunk are created while a chunk is evaluated.
+    memmap : str or bool, optional
+        If given, the population is kept in a memory-mapped file at this
+        path, or in a temporary file if True, instead of in memory. The
+        population is initialized directly in the file, chunk by chunk.
+    constraints : callable or list of callables, optional
+        Cheap constraints, each called with ``constraint(parameters)`` on the
+        2-D array of the parameters of a batch of trials, one trial per row,
+        and returning one value per trial, or a 2-D array of values with one
+        row per trial. A trial satisfies the constraints where all the values
+        are negative or zero, and its violation is the sum of the positive
+        values. The trials are compared by feasibility rules: the lower
+        violation wins, and the energies are compared at equal violations, so
+        that the trials more violating than their parent are discarded
+        without being evaluated by `func`. The violation of the solution is
+        returned as ``constr_violation`` in the result.
+    surrogate : str, optional
+        If given, the energies of the trials are predicted by a model fitted
+        on an archive of the points already evaluated, and only the
+        `surrogate_fraction` of the trials of each batch predicted to improve
+        most on their parent are evaluated by `func`, along with the
+        `surrogate_explore` fraction of the others drawn at random. The other
+        trials are discarded. Should be one of:
+            - 'knn': inverse distance weighted mean of the energies of the
+              5 nearest points
+            - 'rbf': thin plate spline interpolation of the energies of the
+              30 nearest points (requires scipy >= 1.7)
+    surrogate_fraction : float, optional
+        The fraction of the trials evaluated by `func` with a `surrogate`, in
+        the order of their predicted improvement.
+    surrogate_explore : float, optional
+        The fraction of the trials evaluated by `func` with a `surrogate`
+        regardless of their prediction.
+    surrogate_size : int, optional
+        The number of the last points evaluated kept in the archive of the
+        `surrogate`.
+    target : float, optional
+        If given, the minimization stops successfully once the energy of the
+        best solution, satisfying the `constraints` if any, is at most
+        `target`.
+    max_time : float, optional
+        If given, the minimization stops after the generation at which
+        `max_time` seconds have elapsed since its start, not counting
+        `polish`.
+    stagnation : int, optional
+        If positive, the population is considered converged when the best
+        solution has not improved for `stagnation` generations.
+    restarts : int, optional
+        The number of times the minimization is restarted when the
+        population has converged, by `tol` or `stagnation`, before `maxiter`
+        is reached: the population is initialized again by `init`,
+        `popsize_growth` times as large as the previous initial population
+        (IPOP), and keeps the best solution so far. The generations and the
+        function evaluations count towards `maxiter` and `max_nfev` across
+        restarts, and the number of restarts is returned as ``nrestarts`` in
+        the result.
+    popsize_growth : float, optional
+        The growth factor of the population size at each restart.
+    integrality : array_like of bool, optional
+        For each parameter, whether it is constrained to the integers between
+        its bounds, broadcast to ``(len(bounds),)``. The integer parameters
+        are rounded when the trials are scaled, and each integer between the
+        bounds is equally likely. The trials identical to their parent once
+        rounded are discarded, and the identical trials of a batch are
+        evaluated once.
     """
-    solver = DifferentialEvolutionSolver(func, bounds, args=args, x0=None,
-                                         strategy=strategy, maxiter=maxiter,
-                                         popsize=popsize, popscale=popscale, tol=tol, mutation=mutation,
-                                         recombination=recombination,
-                                         seed=seed, polish=polish,
-                                         earlystop=earlystop,
-                                         callbacks=callbacks,
-                                         disp=disp,
-                                         init=init)
-    return solver.solve()
+    with DifferentialEvolutionSolver(func, bounds, args=args, x0=None,
+                                     strategy=strategy, maxiter=maxiter,
+                                     popsize=popsize, popscale=popscale,
+                                     tol=tol, mutation=mutation,
+                                     recombination=recombination,
+                                     seed=seed, polish=polish,
+                                     earlystop=earlystop,
+                                     callbacks=callbacks,
+                                     disp=disp,
+                                     init=init,
+                                     bounds_handling=bounds_handling,
+                                     backend=backend,
+                                     layout=layout,
+                                     order=order,
+                                     pipeline=pipeline,
+                                     workers=workers,
+                                     cache_tol=cache_tol,
+                                     cache_size=cache_size,
+                                     checkpoint_path=checkpoint_path,
+                                     checkpoint_every=checkpoint_every,
+                                     adaptive=adaptive,
+                                     memory_size=memory_size,
+                                     pbest=pbest,
+                                     archive=archive,
+                                     max_nfev=max_nfev,
+                                     population_reduction=population_reduction,
+                                     min_popsize=min_popsize,
+                                     profile=profile,
+                                     polish_top_k=polish_top_k,
+                                     polish_maxiter=polish_maxiter,
+                                     asynchronous=asynchronous,
+                                     max_inflight=max_inflight,
+                                     dtype=dtype,
+                                     max_batch=max_batch,
+                                     memmap=memmap,
+                                     constraints=constraints,
+                                     surrogate=surrogate,
+                                     surrogate_fraction=surrogate_fraction,
+                                     surrogate_explore=surrogate_explore,
+                                     surrogate_size=surrogate_size,
+                                     target=target,
+                                     max_time=max_time,
+                                     stagnation=stagnation,
+                                     restarts=restarts,
+                                     popsize_growth=popsize_growth,
+                                     integrality=integrality) as solver:
+        if resume is not None:
+            solver.load_checkpoint(resume)
+        return solver.solve()
 
 class DifferentialEvolutionSolver(object):
+    """This class implements the differential evolution solver.
+
+    The parameters are as in `differential_evolution`. The minimization is
+    run by `solve`, or driven by the caller with `ask` and `tell`, e.g. to
+    schedule the evaluations on remote workers::
+
+        with DifferentialEvolutionSolver(func, bounds) as solver:
+            while not solver.tell(evaluate(solver.ask())):
+                pass
+            result = solver.result()
+    """
 
     # Dispatch of mutation strategy method (binomial or exponential).
     _binomial = {'best1bin': '_best1',
                  'randtobest1bin': '_randtobest1',
                  'best2bin': '_best2',
                  'rand2bin': '_rand2',
-                 'rand1bin': '_rand1'}
+                 'rand1bin': '_rand1',
+                 'currenttopbest1bin': '_currenttopbest1'}
     _exponential = {'best1exp': '_best1',
                     'rand1exp': '_rand1',
                     'randtobest1exp': '_randtobest1',
                     'best2exp': '_best2',
-                    'rand2exp': '_rand2'}
+                    'rand2exp': '_rand2',
+                    'currenttopbest1exp': '_currenttopbest1'}
+
+    # Dispatch of population initialization method.
+    _init_methods = {'latinhypercube': 'init_population_lhs',
+                     'opposition': 'init_population_lhs',
+                     'random': 'init_population_random',
+                     'sobol': 'init_population_sobol',
+                     'halton': 'init_population_halton'}
+
+    # Dispatch of boundary handling method.
+    _bounds_handling = {'random': '_bounds_random',
+                        'clip': '_bounds_clip',
+                        'reflect': '_bounds_reflect',
+                        'midpoint': '_bounds_midpoint',
+                        'wrap': '_bounds_wrap'}
+
+    # Number of distinct population members drawn by each mutation strategy.
+    _samples = {'_best1': 2,
+                '_rand1': 3,
+                '_randtobest1': 2,
+                '_best2': 4,
+                '_rand2': 5,
+                '_currenttopbest1': 2}
 
     def __init__(self, func, bounds, args=(), x0=None,
                  strategy='best1bin', maxiter=None, popsize=0, popscale=15,
                  tol=0.01, mutation=(0.5, 1), recombination=0.7, seed=None,
                  callbacks=None, earlystop=None, disp=False, polish=False,
-                 init='latinhypercube'):
+                 init='latinhypercube', bounds_handling='random',
+                 backend=None, layout='columns', order='F',
+                 pipeline=False, workers=1, cache_tol=None,
+                 cache_size=100000, checkpoint_path=None,
+                 checkpoint_every=10, adaptive=False, memory_size=5,
+                 pbest=0.1, archive=False, max_nfev=None,
+                 population_reduction=None, min_popsize=0, profile=False,
+                 polish_top_k=1, polish_maxiter=100, asynchronous=False,
+                 max_inflight=0, dtype=np.float64, max_batch=None,
+                 memmap=None, constraints=None, surrogate=None,
+                 surrogate_fraction=0.25, surrogate_explore=0.05,
+                 surrogate_size=1000, target=None, max_time=None,
+                 stagnation=0, restarts=0, popsize_growth=2,
+                 integrality=None):
 
         if strategy in self._binomial:
             self.mutation_func = getattr(self, self._binomial[strategy])
@@ -161,13 +525,35 @@ class DifferentialEvolutionSolver(object):
         else:
             raise ValueError("Please select a valid mutation strategy")
         self.strategy = strategy
+        self.num_samples = self._samples[self.mutation_func.__name__]
+
+        if bounds_handling not in self._bounds_handling:
+            raise ValueError("The bounds handling method must be one of %s"
+                             % ", ".join(sorted(self._bounds_handling)))
+        self.bounds_func = getattr(self,
+                                   self._bounds_handling[bounds_handling])
 
         if callbacks is not None and callable(callbacks):
             self.callbacks = (callbacks,)
         else:
             self.callbacks = callbacks
         self.earlystop = earlystop
+
+        if constraints is not None and callable(constraints):
+            self.constraints = (constraints,)
+        elif constraints is not None:
+            self.constraints = tuple(constraints)
+        else:
+            self.constraints = None
+
+        if polish is True:
+            polish = 'gradient'
+        if polish and polish not in _POLISH_METHODS:
+            raise ValueError("The polishing method must be one of %s"
+                             % ", ".join(sorted(_POLISH_METHODS)))
         self.polish = polish
+        self.polish_top_k = polish_top_k
+        self.polish_maxiter = polish_maxiter
         self.tol = tol
 
         # Mutation constant should be in [0, 2). If specified as a sequence
@@ -187,8 +573,73 @@ class DifferentialEvolutionSolver(object):
 
         self.cross_over_probability = recombination
 
+        # The memory of successful mutation and recombination constants, and
+        # the constants of the current trials.
+        self.adaptive = adaptive
+        if adaptive:
+            self.memory_scale = np.full(memory_size, np.mean(mutation))
+            self.memory_recombination = np.full(memory_size, recombination)
+            self.memory_index = 0
+            self.dither = None
+
+        self.pbest = pbest
+
         self.func = func
         self.args = args
+        self.backend = _make_backend(backend)
+
+        # A scalar objective function is wrapped into a batched one evaluating
+        # the rows of the parameter matrix across a pool of processes.
+        self._pool = None
+        if workers != 1:
+            if backend is not None and not isinstance(self.backend,
+                                                      NumpyBackend):
+                raise ValueError("workers requires the 'numpy' backend")
+            self._pool = _PoolEvaluator(func, args, workers)
+            self.func = self._pool
+            self.args = ()
+            self.backend = NumpyBackend()
+            layout = 'matrix'
+
+        if layout not in ('columns', 'matrix'):
+            raise ValueError("The layout must be one of 'columns' or 'matrix'")
+        if order not in ('F', 'C'):
+            raise ValueError("The order must be one of 'F' or 'C'")
+        self.layout = layout
+        self.order = order
+
+        if asynchronous and self._pool is None:
+            raise ValueError("asynchronous requires workers other than 1")
+        self.asynchronous = asynchronous
+        self.pipeline = pipeline and not asynchronous
+        self.max_inflight = (max_inflight or
+                             (self._pool.workers if asynchronous else 0))
+
+        self._cache = None
+        if cache_tol is not None:
+            self._cache = _EnergyCache(cache_tol, cache_size)
+        self._nfev = 0
+
+        self.profile = profile
+        self._timer = _NullTimer()
+
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        self._resume = None
+
+        # The state of the minimization driven by `ask` and `tell`.
+        self._nit = None
+        self._asked = None
+        self._executor = None
+        self._trial_buffers = []
+        self._duplicates = None
+        self._restarts = 0
+        self._stagnant_generations = 0
+        # called with the generation at its end, before anything else, e.g.
+        # to exchange members with the other islands.
+        self._migration = None
+        self._status_message = _status_message['success']
+        self._warning_flag = False
 
         # convert tuple of lower and upper bounds to limits
         # [(low_0, high_0), ..., (low_n, high_n]
@@ -200,6 +651,22 @@ class DifferentialEvolutionSolver(object):
                              'real valued (min, max) pairs for each value'
                              ' in x')
 
+        # the integer parameters take the integers between their bounds with
+        # equal probability.
+        self.integrality = None
+        if integrality is not None and np.any(integrality):
+            self.integrality = np.array(np.broadcast_to(
+                integrality, np.size(self.limits, 1)), dtype=bool)
+            lower = np.ceil(self.limits[0, self.integrality])
+            upper = np.floor(self.limits[1, self.integrality])
+            if np.any(lower > upper):
+                raise ValueError("The bounds of an integer parameter must "
+                                 "include an integer")
+            self.limits[0, self.integrality] = np.nextafter(lower - 0.5,
+                                                            np.inf)
+            self.limits[1, self.integrality] = np.nextafter(upper + 0.5,
+                                                            -np.inf)
+
         self.maxiter = maxiter or 1000
 
         # population is scaled to between [0, 1].
@@ -217,29 +684,134 @@ class DifferentialEvolutionSolver(object):
         # there are other population initializations possible.
         self.num_population_members = popsize or popscale * self.parameter_count
 
+        if self.num_population_members <= self.num_samples:
+            raise ValueError("The population size must be larger than %d for "
+                             "the %s strategy" % (self.num_samples, strategy))
+
         self.population_shape = (self.num_population_members,
                                  self.parameter_count)
 
-        if init == 'latinhypercube':
-            self.init_population_lhs()
-        elif init == 'random':
-            self.init_population_random()
-        else:
+        # the budget of evaluations of the linear population reduction.
+        self.max_nfev = max_nfev
+        self._nfev_budget = (max_nfev or
+                             (self.maxiter + 1) * self.num_population_members)
+        self.target = target
+        self.max_time = max_time
+        self.stagnation = stagnation
+
+        if restarts < 0 or popsize_growth < 1:
+            raise ValueError("The number of restarts must be non-negative, "
+                             "and the population growth at least 1")
+        self.restarts = restarts
+        self.popsize_growth = popsize_growth
+
+        if population_reduction not in (None, 'linear', 'convergence'):
+            raise ValueError("The population reduction must be one of "
+                             "'linear' or 'convergence'")
+        self.population_reduction = population_reduction
+        self.min_popsize = min_popsize or max(4, self.num_samples + 1)
+        if not self.num_samples < self.min_popsize:
+            raise ValueError("The minimum population size must be larger than "
+                             "%d for the %s strategy"
+                             % (self.num_samples, strategy))
+        self._initial_population_members = self.num_population_members
+        self._reduction_progress = 0.
+
+        if init not in self._init_methods:
             raise ValueError("The population initialization method must be one"
-                             "of 'latinhypercube' or 'random'")
-
-        self.population_energies = (np.ones(self.num_population_members)
-                                    * np.inf)
+                             " of 'latinhypercube', 'random', 'sobol', "
+                             "'halton' or 'opposition'")
+        self.init = init
+        self.opposition = init == 'opposition'
+
+        # the population is initialized in double precision, and kept in
+        # `dtype`.
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float32, np.float64):
+            raise ValueError("The dtype must be one of float32 or float64")
+        self.memmap = memmap
+        self._memmap_file = None
+
+        if not (max_batch is None or max_batch == 'auto'
+                or isinstance(max_batch, numbers.Integral) and max_batch > 0):
+            raise ValueError("max_batch must be a positive integer or 'auto'")
+        self.max_batch = max_batch
+        self._device_rows = None
+
+        self.archive = None
+        self._allocate_population(self.num_population_members)
+        self._initial = None
+
+        if archive:
+            self.archive = np.zeros_like(self.population)
+            self.archive_size = 0
+
+        self._surrogate = None
+        if surrogate is not None and not asynchronous:
+            if not (0 < surrogate_fraction <= 1
+                    and 0 <= surrogate_explore <= 1):
+                raise ValueError("The surrogate fractions must be in (0, 1] "
+                                 "and [0, 1]")
+            self._surrogate = _Surrogate(surrogate, self.parameter_count,
+                                         surrogate_size)
+        self.surrogate_fraction = surrogate_fraction
+        self.surrogate_explore = surrogate_explore
 
         self.disp = disp
 
-        self.init_pycuda_arrays()
-
         if x0 is not None:
             p0 = self._unscale_parameters(x0)
             self.population[0][:] = x0
 
 
+    def _allocate_population(self, size):
+        """
+        initialize a population of `size` members by the `init` method, and
+        allocate the arrays of their energies and constants, of the archive,
+        and of the backend if their size changes.
+        """
+        self.num_population_members = size
+        self.population_shape = (size, self.parameter_count)
+
+        # the population is initialized in place, chunk by chunk, so that a
+        # memory-mapped one is never held in memory.
+        self._close_memmap()
+        if self.memmap is not None and self.memmap is not False:
+            self.population, self._memmap_file = _memmap_empty(
+                self.population_shape, self.dtype, self.memmap)
+        else:
+            self.population = np.empty(self.population_shape, self.dtype)
+        getattr(self, self._init_methods[self.init])()
+
+        self.population_energies = (np.ones(len(self.population))
+                                    * np.inf)
+
+        # the violations of the constraints, zero without constraints.
+        self.population_violations = np.zeros(len(self.population))
+
+        if self.adaptive:
+            self._trial_scale = np.zeros(len(self.population))
+            self._trial_recombination = np.zeros(len(self.population))
+
+        if self.archive is not None:
+            self.archive = np.zeros_like(self.population)
+            self.archive_size = 0
+
+        # the arrays of the backend hold chunks of at most `_device_rows`
+        # members of the population, or of the initial population and its
+        # opposite, which are evaluated together.
+        rows = len(self.population)
+        if self.opposition:
+            rows *= 2
+        if self.max_batch == 'auto':
+            # the arrays grow with the chunks of the initial evaluation.
+            rows = min(rows, _AUTO_BATCH_MIN)
+        elif self.max_batch is not None:
+            rows = min(self.max_batch, rows)
+        if rows != self._device_rows:
+            self._device_rows = rows
+            self.init_device_arrays()
+
     def init_population_lhs(self):
         """
         Initializes the population with Latin Hypercube Sampling.
@@ -256,20 +828,26 @@ class DifferentialEvolutionSolver(object):
 
         # Within each segment we sample from a uniform random distribution.
         # We need to do this sampling for each parameter.
-        samples = (segsize * rng.random_sample(self.population_shape)
-
-        # Offset each segment to cover the entire parameter range [0, 1)
-                   + np.linspace(0., 1., self.num_population_members,
-                                 endpoint=False)[:, np.newaxis])
+        for rows in self._init_chunks():
+            count = rows.stop - rows.start
+            self.population[rows] = (
+                segsize * _random(rng, (count, self.parameter_count))
 
-        # Create an array for population of candidate solutions.
-        self.population = np.zeros_like(samples)
+                # Offset each segment to cover the entire parameter range
+                # [0, 1)
+                + segsize * np.arange(rows.start, rows.stop)[:, np.newaxis])
 
         # Initialize population of candidate solutions by permutation of the
-        # random samples.
-        for j in range(self.parameter_count):
-            order = rng.permutation(range(self.num_population_members))
-            self.population[:, j] = samples[order, j]
+        # random samples, of each parameter independently, for as many
+        # parameters at once as fit in a chunk.
+        width = max(1, _INIT_CHUNK_SIZE // self.num_population_members)
+        for start in range(0, self.parameter_count, width):
+            columns = slice(start, min(start + width, self.parameter_count))
+            count = columns.stop - columns.start
+            order = np.argsort(
+                _random(rng, (self.num_population_members, count)), axis=0)
+            self.population[:, columns] = np.take_along_axis(
+                self.population[:, columns], order, axis=0)
 
     def init_population_random(self):
         """
@@ -277,15 +855,107 @@ class DifferentialEvolutionSolver(object):
         can possess clustering, Latin Hypercube sampling is generally better.
         """
         rng = self.random_number_generator
-        self.population = rng.random_sample(self.population_shape)
+        for rows in self._init_chunks():
+            self.population[rows] = _random(
+                rng, (rows.stop - rows.start, self.parameter_count))
 
-    def init_pycuda_arrays(self):
+    def init_population_sobol(self):
+        """
+        Initializes the population with a scrambled Sobol' sequence, which
+        covers the parameter space more evenly than random sampling.
+        """
+        if qmc is None:
+            raise ImportError("The 'sobol' initialization requires "
+                              "scipy.stats.qmc")
+        rng = self.random_number_generator
+        sampler = qmc.Sobol(self.parameter_count, scramble=True,
+                            seed=_integers(rng, 2 ** 31))
+
+        for rows in self._init_chunks():
+            count = rows.stop - rows.start
+            if rows.start == 0:
+                # the sequence is balanced over powers of 2 points, of which
+                # the points past the population are dropped.
+                count = 2 ** int(np.ceil(np.log2(count)))
+            self.population[rows] = sampler.random(count)[
+                :rows.stop - rows.start]
+
+    def init_population_halton(self):
+        """
+        Initializes the population with a scrambled Halton sequence, which
+        covers the parameter space more evenly than random sampling.
+        """
+        if qmc is None:
+            raise ImportError("The 'halton' initialization requires "
+                              "scipy.stats.qmc")
+        rng = self.random_number_generator
+        sampler = qmc.Halton(self.parameter_count, scramble=True,
+                             seed=_integers(rng, 2 ** 31))
+        for rows in self._init_chunks():
+            self.population[rows] = sampler.random(rows.stop - rows.start)
+
+    def _init_chunks(self):
+        """
+        the slices of the rows of the population initialized at once: a power
+        of 2 rows, of at most `_INIT_CHUNK_SIZE` values when possible.
+        """
+        size = self.num_population_members
+        rows = max(1, _INIT_CHUNK_SIZE // self.parameter_count)
+        rows = 2 ** int(np.log2(rows))
+        return [slice(start, min(start + rows, size))
+                for start in range(0, size, rows)]
+
+    def init_device_arrays(self):
+        """
+        Allocates the arrays of the backend that are passed to the objective
+        function, one for each parameter, or a single one holding all the
+        parameters with the 'matrix' layout. A zero-copy backend receives
+        views of the parameters on the host instead, unless the 'matrix'
+        layout requires them to be transposed.
+        """
         dtype = self.population.dtype
-        self.gpu_arrays = []
+        self.device_arrays = []
+        num_rows = self._device_rows
+
+        if self.layout == 'matrix':
+            if not (self.backend.zero_copy and self.order == 'F'):
+                array = self.backend.allocate(
+                    num_rows * self.parameter_count, dtype)
+                self.device_arrays.append(array)
+            return
+
+        if self.backend.zero_copy:
+            return
 
         for i in range(self.parameter_count):
-            array = garray.zeros(self.num_population_members, dtype=dtype)
-            self.gpu_arrays.append(array)
+            array = self.backend.allocate(num_rows, dtype)
+            self.device_arrays.append(array)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Releases the pool of worker processes and the thread creating the
+        trials in the background, if any.
+        """
+        self._shutdown_executor()
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+        self._close_memmap()
+
+    def _close_memmap(self):
+        """
+        close the temporary file of the memory-mapped population, if any,
+        which stays mapped until the population is released.
+        """
+        if self._memmap_file is not None:
+            self._memmap_file.close()
+            self._memmap_file = None
 
     @property
     def x(self):
@@ -298,11 +968,69 @@ class DifferentialEvolutionSolver(object):
         """
         return self._scale_parameters(self.population[0])
 
-    def evaluate_func(self, parameters):
-        for index, (dest, src) in enumerate(zip(self.gpu_arrays, parameters.T)):
-            gdrv.memcpy_htod(dest.gpudata, src)
+    def evaluate_func(self, parameters, args=None):
+        """
+        evaluate the objective function on each row of `parameters`, and
+        return the energies as a numpy array. `args` replaces the additional
+        fixed parameters of the objective function, if given.
+        """
+        if args is None:
+            args = self.args
+
+        with self._timer.phase('transfer'):
+            if self.layout == 'matrix':
+                arrays = self._device_matrix(parameters)
+            elif self.backend.zero_copy:
+                arrays = list(parameters.T)
+            else:
+                num_rows = len(parameters)
+                arrays = [array[:num_rows] for array in self.device_arrays]
+                for dest, src in zip(arrays, parameters.T):
+                    self.backend.to_device(dest, src)
+
+        with self._timer.phase('evaluation'):
+            return self.backend.to_host(self.func(arrays, *args))
+
+    def _evaluate(self, parameters):
+        """
+        evaluate the objective function on each row of `parameters`, taking
+        the energies from the cache where possible, and count the function
+        evaluations.
+        """
+        if self._cache is None:
+            self._nfev += len(parameters)
+            return self.evaluate_func(parameters)
+
+        with self._timer.phase('cache'):
+            keys = self._cache.keys(parameters)
+            energies, found = self._cache.lookup(keys)
+            missing = np.flatnonzero(~found)
+
+        if len(missing):
+            energies[missing] = self.evaluate_func(
+                np.asfortranarray(parameters[missing]))
+            with self._timer.phase('cache'):
+                self._cache.update([keys[index] for index in missing],
+                                   energies[missing])
+            self._nfev += len(missing)
+        return energies
+
+    def _device_matrix(self, parameters):
+        """
+        copy `parameters` into the matrix passed to the objective function with
+        a single transfer.
+        """
+        if not self.device_arrays and parameters.flags.f_contiguous:
+            return parameters
 
-        return self.func(self.gpu_arrays, *self.args)
+        shape = parameters.shape
+        if self.device_arrays:
+            matrix = self.device_arrays[0][:shape[0] * shape[1]]
+            matrix = matrix.reshape(shape, order=self.order)
+        else:
+            matrix = np.empty(shape, dtype=parameters.dtype, order=self.order)
+        self.backend.to_device(matrix, parameters)
+        return matrix
 
     def solve(self):
         """
@@ -318,72 +1046,497 @@ class DifferentialEvolutionSolver(object):
             was employed, and a lower minimum was obtained by the polishing,
             then OptimizeResult also contains the ``jac`` attribute.
         """
+        # do the optimisation.
+        if self.asynchronous:
+            self._evolve_asynchronous()
+        else:
+            while True:
+                parameters = self.ask()
+
+                # determine the energy of the objective function
+                if self._tell(self._evaluate_rows(parameters)):
+                    break
+
+        DE_result = self.result()
+        self._shutdown_executor()
+        self._nit = None
+
+        if self._timer.enabled:
+            self._timer = _NullTimer()
 
-        nfev, nit, warning_flag = 0, 0, False
-        status_message = _status_message['success']
+        if self.polish:
+            jac = self._polish_population()
+            DE_result.nfev = self._nfev
+
+            if self.population_energies[0] < DE_result.fun:
+                DE_result.fun = self.population_energies[0]
+                DE_result.x = self.x
+                if jac is not None:
+                    DE_result.jac = jac
+
+        return DE_result
+
+    def ask(self):
+        """
+        Returns the parameters of the next trials to be evaluated, one trial
+        per row. The first calls return the initial population, unless the
+        minimization is resumed from a checkpoint.
+
+        The energies of the trials are then passed to `tell`, in the same
+        order, before `ask` is called again. All the trials of a generation
+        are returned at once, or in chunks of at most `max_batch` trials, or
+        half of them when pipelined, in which case the trials of the next
+        chunk are created in the background until `tell` is called. With
+        `constraints`, only the trials that may replace their parent are
+        returned, and with a `surrogate`, only those selected by it. With
+        `integrality`, the trials identical to their parent are not returned,
+        and the identical trials are returned once, their energy being passed
+        once to `tell`. The returned array may be a view of a buffer of the
+        solver, which is overwritten by the next calls to `ask`.
+        """
+        if self._asked is not None:
+            raise RuntimeError('tell must be called with the energies of the '
+                               'trials before ask is called again')
+
+        if self._nit is None:
+            self._start()
+
+        if self._initial is not None:
+            # calculate energies to start with
+            rows = self._initial_chunks[self._chunk]
+            count = self._budget(len(self._initial[rows]))
+            rows = slice(rows.start, rows.start + count)
+            if count > self._device_rows:
+                # the arrays of the backend are only as large as the chunk
+                # size being tuned.
+                self._device_rows = count
+                self.init_device_arrays()
+            self._asked = (None, rows, None)
+            self._asked_at = default_timer()
+            parameters = np.asfortranarray(
+                self._scale_parameters(self._initial[rows]),
+                dtype=self.population.dtype)
+            if self.constraints is not None:
+                self._initial_violations[rows] = self._violation(parameters)
+            return self._deduplicate(parameters)
+
+        candidates = self._chunks[self._chunk]
+        trials, parameters = self._slot_view(self._slot, len(candidates))
+        if self.pipeline:
+            self._pending.result()
+            evaluated = self._screen(candidates, trials, parameters)
+
+            # the trials of the next chunk are created while this chunk is
+            # being evaluated.
+            following = (self._chunk + 1) % len(self._chunks)
+            if following == 0:
+                self._update_scale()
+            self._submit_trials(following, 1 - self._slot)
+        else:
+            if self._chunk == 0:
+                self._update_scale()
+
+            # Unlike the standard DE, all the trials of a chunk are created
+            # first and later evaluated simultaneously.
+            self._make_trials(candidates, trials, parameters)
+            evaluated = self._screen(candidates, trials, parameters)
+
+        count = len(candidates) if evaluated is None else len(evaluated)
+        if self._budget(count) < count:
+            # the trials past `max_nfev` are discarded.
+            if evaluated is None:
+                evaluated = np.arange(len(candidates))
+            evaluated = evaluated[:self._budget(count)]
+
+        self._asked = (candidates, self._slot, evaluated)
+        if evaluated is not None:
+            parameters = np.asfortranarray(parameters[evaluated])
+        return self._deduplicate(parameters)
+
+    def tell(self, energies):
+        """
+        Passes the `energies` of the trials returned by the last call to
+        `ask`, and selects the population members. At the end of each
+        generation, the convergence is measured, and the population reduction,
+        the checkpoint and the callbacks are carried out.
+
+        Returns True when the minimization should stop, in which case the
+        cause is given by the ``message`` of `result`.
+        """
+        energies = np.asarray(energies, dtype=np.float64)
+        self._nfev += len(energies)
+        return self._tell(energies)
+
+    def result(self):
+        """
+        Returns the ``OptimizeResult`` of the minimization so far, without
+        polishing.
+        """
+        DE_result = OptimizeResult(
+            x=self.x,
+            fun=self.population_energies[0],
+            nfev=self._nfev,
+            nit=self._nit,
+            message=self._status_message,
+            success=(self._warning_flag is not True))
+
+        if self.restarts:
+            DE_result.nrestarts = self._restarts
+
+        if self.constraints is not None:
+            DE_result.constr_violation = self.population_violations[0]
+            if DE_result.constr_violation > 0:
+                DE_result.success = False
+                DE_result.message = ('The solution does not satisfy the '
+                                     'constraints, MAXCV = %g'
+                                     % DE_result.constr_violation)
+
+        if self._cache is not None:
+            DE_result.cache_hits = self._cache.hits
+            DE_result.cache_misses = self._cache.misses
+
+        if self._timer.enabled:
+            DE_result.timings = self._timer.records
+            DE_result.timing_totals = self._timer.totals
+
+        return DE_result
+
+    def _start(self):
+        """
+        set up the state of a new minimization, whose population has yet to
+        be evaluated, or of the one resumed from a checkpoint.
+        """
+        self._status_message = _status_message['success']
+        self._warning_flag = False
+
+        if self.profile:
+            hook = self.profile if callable(self.profile) else None
+            self._timer = _Timer(hook)
+
+        if self.pipeline and self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+
+        self._chunk = 0
+        self._slot = 0
+        self._started_at = default_timer()
+
+        resume = self._resume
+        self._resume = None
+        if resume is None:
+            self._nit = 0
+            self._nfev = 0
+            self._restarts = 0
+            self._stagnant_generations = 0
+            self._begin_initialization()
+            return
+
+        self._nit = resume['nit']
+        self._nfev = resume['nfev']
+        self._restarts = resume['restarts']
+        self._stagnant_generations = resume['stagnant_generations']
+        self._best_energy = self.population_energies[0]
+        self._best_violation = self.population_violations[0]
+        self._chunks = self._partition()
+        self._allocate_slots()
+        if 'trials' in resume:
+            # the trials of the first chunk were restored with the
+            # checkpoint.
+            trials, parameters = self._slot_view(0, len(self._chunks[0]))
+            trials[:] = resume['trials'][:len(trials)]
+            parameters[:] = self._scale_parameters(trials)
+        if self.pipeline:
+            self._pending = Future()
+            self._pending.set_result(None)
+
+        # the restart decided at the generation of the checkpoint.
+        if resume['restart']:
+            self._restart()
+
+    def _deduplicate(self, parameters):
+        """
+        the distinct rows of `parameters`, in their order, with integer
+        parameters. Where the rows of `parameters` are among them is kept in
+        `_duplicates` when some rows are identical.
+        """
+        self._duplicates = None
+        if self.integrality is None or len(parameters) < 2:
+            return parameters
+
+        _, first, inverse = np.unique(parameters, axis=0, return_index=True,
+                                      return_inverse=True)
+        if len(first) == len(parameters):
+            return parameters
+
+        order = np.argsort(first)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        self._duplicates = rank[inverse.ravel()]
+        return np.asfortranarray(parameters[first[order]])
+
+    def _begin_initialization(self, first=0):
+        """
+        prepare the evaluation of the population members from `first` on, and
+        of their opposites with the 'opposition' initialization.
+        """
+        self._first = first
+        members = self.population[first:]
+        if self.opposition:
+            # the population and its opposite are evaluated together, and
+            # the best half is kept.
+            self._initial = np.concatenate((members, 1. - members))
+            self._initial_energies = np.full(len(self._initial), np.inf)
+            self._initial_violations = np.zeros(len(self._initial))
+        else:
+            self._initial = members
+            self._initial_energies = self.population_energies[first:]
+            self._initial_violations = self.population_violations[first:]
+
+        # the chunks grow geometrically when the chunk size is tuned,
+        # to measure the throughput of each size.
+        if self.max_batch is None:
+            size = len(self._initial)
+        elif self.max_batch == 'auto':
+            size = _AUTO_BATCH_MIN
+            largest = min(len(self._initial), _AUTO_BATCH_MAX)
+        else:
+            size = self._device_rows
+        self._initial_chunks = []
+        start = 0
+        while start < len(self._initial):
+            self._initial_chunks.append(slice(start, start + size))
+            start += size
+            if self.max_batch == 'auto':
+                size = min(2 * size, largest)
+        self._chunk = 0
+        self._throughputs = []
+
+    def _tell(self, energies):
+        """
+        `tell`, with the function evaluations already counted.
+        """
+        if self._asked is None:
+            raise RuntimeError('ask must be called before tell')
+        candidates, slot, evaluated = self._asked
+        self._asked = None
+        if self._duplicates is not None:
+            # the identical trials share the energy of the first one.
+            energies = energies[self._duplicates]
+            self._duplicates = None
+
+        if candidates is None:
+            rows = slot
+            self._initial_energies[rows] = energies
+            if self._surrogate is not None:
+                self._surrogate.update(self._initial[rows], energies)
+            self._throughputs.append(
+                (len(energies), default_timer() - self._asked_at))
+
+            self._chunk += 1
+            if (self._chunk == len(self._initial_chunks)
+                    or self._exhausted()):
+                self._end_initialization()
+            if self._exhausted():
+                # the members past `max_nfev` are left unevaluated.
+                self._warning_flag = True
+                self._status_message = _status_message['maxfev']
+                return True
+            return False
+
+        if self.pipeline:
+            # the population can be changed only after the next chunk has
+            # drawn from it.
+            self._pending.result()
+        trials, _ = self._slot_view(slot, len(candidates))
+        violations = None
+        if self.constraints is not None:
+            violations = self._trial_violations
+        if evaluated is not None:
+            # the trials discarded without evaluation are not selected.
+            candidates, trials = candidates[evaluated], trials[evaluated]
+            if violations is not None:
+                violations = violations[evaluated]
+
+        if self._surrogate is not None:
+            self._surrogate.update(trials, energies)
+        self._select(candidates, trials, energies, violations)
+
+        if self.pipeline:
+            self._slot = 1 - self._slot
+        self._chunk += 1
+        if self._chunk < len(self._chunks):
+            if self._exhausted():
+                # the generation is cut short by `max_nfev`.
+                self._warning_flag = True
+                self._status_message = _status_message['maxfev']
+                return True
+            return False
+        self._chunk = 0
+        return self._end_generation()
+
+    def _budget(self, count):
+        """
+        how many of `count` evaluations are left within `max_nfev`.
+        """
+        if self.max_nfev is None:
+            return count
+        return max(0, min(count, self.max_nfev - self._nfev))
 
-        # calculate energies to start with
-        parameters = np.zeros_like(self.population, order='F')
-        for index, candidate in enumerate(self.population):
-            parameters[index, :] = self._scale_parameters(candidate)
+    def _exhausted(self):
+        """
+        whether the evaluations have reached `max_nfev`.
+        """
+        return self.max_nfev is not None and self._nfev >= self.max_nfev
 
-        self.population_energies[:] = self.evaluate_func(parameters)
-        nfev += self.num_population_members
+    def _screen(self, candidates, trials, parameters):
+        """
+        the indices of the trials of the `candidates` to be evaluated, or None
+        for all of them: those that may replace their parent given the
+        violation of the constraints and different from their parent once
+        rounded, and among them, those selected by the surrogate.
+        """
+        evaluated = None
+        if self.constraints is not None:
+            # the trials violating the constraints more than their parent
+            # lose the selection whatever their energy.
+            self._trial_violations = self._violation(parameters)
+            evaluated = np.flatnonzero(self._trial_violations <=
+                                       self.population_violations[candidates])
+
+        if self.integrality is not None:
+            # the trials identical to their parent once rounded cannot
+            # improve on it.
+            parents = self._scale_parameters(self.population[candidates])
+            differ = np.flatnonzero(np.any(
+                parameters != parents.astype(parameters.dtype), axis=1))
+            if evaluated is not None:
+                differ = np.intersect1d(evaluated, differ)
+            evaluated = differ
+
+        if self._surrogate is None or not self._surrogate.ready:
+            return evaluated
+        if evaluated is None:
+            evaluated = np.arange(len(candidates))
+
+        with self._timer.phase('surrogate'):
+            improvements = (self._surrogate.predict(trials[evaluated])
+                            - self.population_energies[candidates[evaluated]])
+            order = np.argsort(improvements)
+
+            # the most promising trials, and a quota of the others at random.
+            count = int(np.ceil(self.surrogate_fraction * len(evaluated)))
+            explored = int(np.ceil(self.surrogate_explore * len(evaluated)))
+            others = self.random_number_generator.permutation(order[count:])
+            chosen = np.concatenate((order[:count], others[:explored]))
+        return evaluated[np.sort(chosen)]
+
+    def _end_initialization(self):
+        """
+        keep the initial population once it has been evaluated, and prepare
+        the first generation.
+        """
+        first = self._first
+        if self.opposition:
+            keep = self._order(self._initial_energies,
+                               self._initial_violations)[
+                :self.num_population_members - first]
+            self.population[first:] = self._initial[keep]
+            self.population_energies[first:] = self._initial_energies[keep]
+            self.population_violations[first:] = (
+                self._initial_violations[keep])
+        self._initial = None
+        self._initial_energies = self._initial_violations = None
 
         # put the lowest energy into the best solution position.
-        minval = np.argmin(self.population_energies)
+        minval = self._best_index(self.population_energies,
+                                  self.population_violations)
         self._swap_best(minval)
+        self._best_energy = self.population_energies[0]
+        self._best_violation = self.population_violations[0]
 
-        if warning_flag:
-            return OptimizeResult(
-                           x=self.x,
-                           fun=self.population_energies[0],
-                           nfev=nfev,
-                           nit=nit,
-                           message=status_message,
-                           success=(warning_flag is not True))
+        if self.max_batch == 'auto':
+            rows = self._tuned_batch()
+            if rows != self._device_rows:
+                self._device_rows = rows
+                self.init_device_arrays()
 
-        # do the optimisation.
-        trials = np.zeros_like(self.population, order='F')
-        for nit in range(1, self.maxiter + 1):
-            if self.dither is not None:
-                self.scale = self.random_number_generator.rand(
-                ) * (self.dither[1] - self.dither[0]) + self.dither[0]
-
-            # Unlike the standard DE, all the trials are created first and later
-            # evaluated simultaneously.
-            for index in range(self.num_population_members):
-                # create a trial solution
-                trials[index][:] = self._mutate(index)
-
-                # ensuring that it's in the range [0, 1)
-                self._ensure_constraint(trials[index])
-
-                # scale from [0, 1) to the actual parameter value
-                parameters[index][:] = self._scale_parameters(trials[index])
-
-            # determine the energy of the objective function
-            energies = self.evaluate_func(parameters)
-            nfev += self.num_population_members
-
-            # if the energy of the trial candidate is lower than the
-            # original population member then replace it
-            for index in range(self.num_population_members):
-                if energies[index] < self.population_energies[index]:
-                    self.population[index] = trials[index]
-                    self.population_energies[index] = energies[index]
+        self._chunks = self._partition()
+        self._chunk = 0
+        self._slot = 0
+        self._allocate_slots()
 
-            # if the trial candidate also has a lower energy than the
-            # best solution then replace that as well
-            minval = np.argmin(self.population_energies)
-            self._swap_best(minval)
+        self._timer.end_generation(self._nit)
 
-            # stop when the fractional s.d. of the population is less than tol
-            # of the mean energy
-            convergence = (np.std(self.population_energies) /
-                           np.abs(np.mean(self.population_energies) +
-                                  _MACHEPS))
+        if self.pipeline:
+            self._update_scale()
+            self._submit_trials(0, 0)
 
+    def _end_generation(self):
+        """
+        carry out the end of a generation, and return whether the
+        minimization should stop.
+        """
+        self._nit += 1
+        nit = self._nit
+
+        # the immigrants are part of the population of this generation, as
+        # saved in the checkpoint.
+        if self._migration is not None:
+            with self._timer.phase('migration'):
+                self._migration(nit)
+
+        # stop when the fractional s.d. of the population is less than tol
+        # of the mean energy
+        convergence = (np.std(self.population_energies) /
+                       np.abs(np.mean(self.population_energies) +
+                              _MACHEPS))
+
+        # the number of generations without improvement of the best solution.
+        if self._improves(self.population_energies[0],
+                          self.population_violations[0],
+                          self._best_energy, self._best_violation):
+            self._stagnant_generations = 0
+        else:
+            self._stagnant_generations += 1
+        self._best_energy = self.population_energies[0]
+        self._best_violation = self.population_violations[0]
+
+        if self.population_reduction is not None:
+            size = self._reduced_size(convergence)
+            if size < self.num_population_members:
+                if self.pipeline:
+                    self._pending.result()
+                self._resize_population(size)
+                self._chunks = self._partition()
+
+                # the trials of the first chunk are created again for the
+                # remaining members.
+                if self.pipeline:
+                    self._submit_trials(0, self._slot)
+
+        reached = (self.target is not None
+                   and self.population_violations[0] == 0
+                   and self.population_energies[0] <= self.target)
+        exhausted = self._exhausted()
+        stagnated = bool(self.stagnation
+                         and self._stagnant_generations >= self.stagnation)
+        converged = convergence < self.tol or stagnated
+
+        # the restart is decided before the checkpoint, which records it, and
+        # is carried out unless `earlystop` or `max_time` stop first.
+        restart = (converged and not reached and not exhausted
+                   and self._restarts < self.restarts and nit < self.maxiter)
+
+        if (self.checkpoint_path is not None
+                and nit % self.checkpoint_every == 0):
+            trials = None
+            if self.pipeline:
+                self._pending.result()
+                trials = self._slot_view(self._slot, len(self._chunks[0]))[0]
+            with self._timer.phase('checkpoint'):
+                self.save_checkpoint(self.checkpoint_path, nit, trials,
+                                     restart)
+
+        with self._timer.phase('callbacks'):
             if self.disp:
                 print("differential_evolution step %d: f(x)= %g"
                       % (nit,
@@ -394,55 +1547,590 @@ class DifferentialEvolutionSolver(object):
                     callback(step=nit, parameter=self.x,
                              cost=self.population_energies[0])
 
-            if (self.earlystop and
-                    self.earlystop(self.x,
-                                  convergence=self.tol / convergence) is True):
+            stop_early = (self.earlystop and
+                          self.earlystop(self.x,
+                                         convergence=self.tol / convergence)
+                          is True)
+
+        self._timer.end_generation(nit)
+
+        if stop_early:
+            self._warning_flag = True
+            self._status_message = ('earlystop function requested stop early '
+                                    'by returning True')
+            return True
+
+        if reached:
+            self._status_message = 'The target energy has been reached.'
+            return True
+
+        if exhausted:
+            self._warning_flag = True
+            self._status_message = _status_message['maxfev']
+            return True
+
+        if (self.max_time is not None
+                and default_timer() - self._started_at >= self.max_time):
+            self._warning_flag = True
+            self._status_message = 'Maximum time has been exceeded.'
+            return True
+
+        if restart:
+            self._restart()
+            return False
+
+        if converged:
+            if convergence >= self.tol:
+                self._status_message = ('The best solution has not improved '
+                                        'for %d generations.'
+                                        % self.stagnation)
+            return True
+
+        if nit >= self.maxiter:
+            self._warning_flag = True
+            self._status_message = _status_message['maxiter']
+            return True
+
+        return False
+
+    def _restart(self):
+        """
+        restart the minimization from a new population, `popsize_growth` times
+        as large as the previous initial population, keeping the best solution
+        so far.
+        """
+        if self.pipeline:
+            self._pending.result()
+        best = np.copy(self.population[0])
+        energy = self.population_energies[0]
+        violation = self.population_violations[0]
+
+        size = int(round(self._initial_population_members
+                         * self.popsize_growth))
+        self._allocate_population(size)
+        self.population[0] = best
+        self.population_energies[0] = energy
+        self.population_violations[0] = violation
+        self._initial_population_members = size
+        self._reduction_progress = 0.
+
+        self._restarts += 1
+        self._stagnant_generations = 0
+        self._begin_initialization(1)
+
+    def _evolve_asynchronous(self):
+        """
+        evolve the population in a steady state, keeping `max_inflight` trials
+        under evaluation by the pool of workers, until the minimization should
+        stop.
+        """
+        self._start()
+        stop = False
+        while self._initial is not None:
+            stop = self._tell(self._evaluate_rows(self.ask()))
+
+        inflight = {}
+        evaluating = 0
+        candidate = 0
+        received = 0
+        while not stop:
+            # no more trials are submitted than `max_nfev` allows.
+            while (len(inflight) < self.max_inflight
+                   and self._budget(evaluating + 1) > evaluating):
+                candidate %= self.num_population_members
+                if candidate == 0:
+                    self._update_scale()
+                candidates = np.array([candidate])
+
+                with self._timer.phase('mutation'):
+                    trial = self._mutate(candidates)
+                with self._timer.phase('bounds'):
+                    self._ensure_constraint(trial, candidates)
+                with self._timer.phase('scaling'):
+                    parameters = self._scale_parameters(trial[0])
+
+                violation = None
+                if self.constraints is not None:
+                    violation = self._violation(parameters[np.newaxis])
+
+                # the trial loses the selection whatever its energy if it
+                # violates the constraints more than its parent, or is
+                # identical to it once rounded.
+                discarded = (violation is not None and violation[0] >
+                             self.population_violations[candidate])
+                if self.integrality is not None:
+                    discarded |= np.array_equal(parameters,
+                                                self._scale_parameters(
+                                                    self.population[candidate]))
+                if discarded:
+                    future = Future()
+                    future.set_result(None)
+                else:
+                    future = self._pool.submit(parameters)
+                    evaluating += 1
+                inflight[future] = (candidates, trial, violation,
+                                    self._restarts)
+                candidate += 1
+
+            with self._timer.phase('evaluation'):
+                done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                candidates, trial, violation, restarts = inflight.pop(future)
+                energy = future.result()
+                if energy is None:
+                    energy = np.inf
+                else:
+                    self._nfev += 1
+                    evaluating -= 1
+
+                # the parent may have been dropped by the population reduction,
+                # or replaced at a restart, while its trial was being
+                # evaluated.
+                if (restarts == self._restarts
+                        and candidates[0] < self.num_population_members):
+                    self._select(candidates, trial, np.array([energy]),
+                                 violation)
+
+                received += 1
+                if received == self.num_population_members:
+                    received = 0
+                    stop = self._end_generation()
+                    if stop:
+                        break
+
+                    # the new population of a restart is evaluated at once.
+                    while self._initial is not None:
+                        stop = self._tell(self._evaluate_rows(self.ask()))
+                    if stop:
+                        break
+
+            if not stop and not inflight and self._exhausted():
+                # the generation is cut short by `max_nfev`.
+                self._warning_flag = True
+                self._status_message = _status_message['maxfev']
+                stop = True
+
+        for future in inflight:
+            future.cancel()
+
+    def _submit_trials(self, chunk, slot):
+        """
+        create the trials of the `chunk` of the population in the background,
+        into the buffers `slot`.
+        """
+        candidates = self._chunks[chunk]
+        trials, parameters = self._slot_view(slot, len(candidates))
+        self._pending = self._executor.submit(self._make_trials, candidates,
+                                              trials, parameters)
+
+    def _shutdown_executor(self):
+        """
+        wait for the trials being created in the background, and release the
+        thread creating them.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _polish_population(self):
+        """
+        refine the `polish_top_k` best members of the population in place, and
+        return the gradient at the best one, if estimated.
+        """
+        count = min(self.polish_top_k, self.num_population_members)
+        members = self._order(self.population_energies,
+                              self.population_violations)[:count]
+
+        method = _POLISH_METHODS[self.polish]
+        eps = np.finfo(self.population.dtype).eps
+        x, energies, gradients = method(self._evaluate_unit,
+                                        self.population[members],
+                                        self.population_energies[members],
+                                        maxiter=self.polish_maxiter, eps=eps)
+        violations = self.population_violations[members]
+        if self.constraints is not None:
+            # the local search ignores the constraints, whose violation must
+            # not increase.
+            refined = self._violation(self._scale_parameters(x))
+            kept = refined <= violations
+            x[~kept] = self.population[members[~kept]]
+            energies[~kept] = self.population_energies[members[~kept]]
+            violations = np.where(kept, refined, violations)
+        self.population[members] = x
+        self.population_energies[members] = energies
+        self.population_violations[members] = violations
+
+        best = self._best_index(energies, violations)
+        self._swap_best(members[best])
+        if gradients is not None:
+            return gradients[best] / self.__scale_arg2
+
+    def _evaluate_unit(self, population):
+        """
+        evaluate the objective function on each row of `population`, in the
+        unit hypercube.
+        """
+        return self._evaluate_rows(np.asfortranarray(
+            self._scale_parameters(population), dtype=self.population.dtype))
 
-                warning_flag = True
-                status_message = ('earlystop function requested stop early '
-                                  'by returning True')
-                break
+    def _evaluate_rows(self, parameters):
+        """
+        `_evaluate`, in chunks of at most as many rows as the arrays of the
+        backend hold.
+        """
+        rows = self._device_rows
+        if not len(parameters):
+            return np.empty(0)
+        if len(parameters) <= rows:
+            return self._evaluate(parameters)
+
+        energies = np.empty(len(parameters))
+        for start in range(0, len(parameters), rows):
+            chunk = np.asfortranarray(parameters[start:start + rows])
+            energies[start:start + rows] = self._evaluate(chunk)
+        return energies
+
+    def _allocate_slots(self):
+        """
+        allocate the buffers of the trials and of their parameters, one pair
+        for each chunk of the population in flight, i.e. two when pipelined.
+        The buffers are kept while they are large enough, as the population
+        shrinks, or grows at restarts in chunks of `max_batch`.
+        """
+        size = max(len(candidates) for candidates in self._chunks)
+        size *= self.parameter_count
+        if self._trial_buffers and len(self._trial_buffers[0]) >= size:
+            return
+        count = 2 if self.pipeline else 1
+        dtype = self.population.dtype
+        self._trial_buffers = [np.zeros(size, dtype) for _ in range(count)]
+        self._parameter_buffers = [np.zeros(size, dtype)
+                                   for _ in range(count)]
 
-            if convergence < self.tol or warning_flag:
-                break
+    def _slot_view(self, slot, num_rows):
+        """
+        column-major views of the buffers `slot` of the trials and of their
+        parameters, with `num_rows` rows.
+        """
+        shape = (num_rows, self.parameter_count)
+        size = num_rows * self.parameter_count
+        return (self._trial_buffers[slot][:size].reshape(shape, order='F'),
+                self._parameter_buffers[slot][:size].reshape(shape,
+                                                             order='F'))
+
+    def _partition(self):
+        """
+        the indices of the population members of each chunk of a generation:
+        the chunks of at most as many members as the arrays of the backend
+        hold, or the halves of the population when pipelined.
+        """
+        candidates = np.arange(self.num_population_members)
+        size = self._device_rows
+        if self.pipeline:
+            size = min(size, self.num_population_members
+                       - self.num_population_members // 2)
+            if size * 2 >= self.num_population_members:
+                half = self.num_population_members // 2
+                return [candidates[:half], candidates[half:]]
+        return [candidates[start:start + size]
+                for start in range(0, self.num_population_members, size)]
+
+    def _tuned_batch(self):
+        """
+        the smallest chunk size of the initial evaluation whose throughput is
+        within `_AUTO_BATCH_TOLERANCE` of the best one.
+        """
+        sizes = np.array([size for size, _ in self._throughputs])
+        seconds = np.array([elapsed for _, elapsed in self._throughputs])
+        rates = sizes / np.maximum(seconds, _MACHEPS)
+        good = rates >= (1. - _AUTO_BATCH_TOLERANCE) * np.max(rates)
+        return int(np.min(sizes[good]))
 
+    def _reduced_size(self, convergence):
+        """
+        the population size according to the population reduction schedule.
+        """
+        if self.population_reduction == 'linear':
+            progress = self._nfev / self._nfev_budget
         else:
-            status_message = _status_message['maxiter']
-            warning_flag = True
+            progress = self.tol / max(convergence, _MACHEPS)
 
-        DE_result = OptimizeResult(
-            x=self.x,
-            fun=self.population_energies[0],
-            nfev=nfev,
-            nit=nit,
-            message=status_message,
-            success=(warning_flag is not True))
+        # the population never grows back.
+        self._reduction_progress = max(self._reduction_progress,
+                                       min(progress, 1.))
 
-        if self.polish:
-            result = minimize(self.func,
-                              np.copy(DE_result.x),
-                              method='L-BFGS-B',
-                              bounds=self.limits.T,
-                              args=self.args)
-
-            nfev += result.nfev
-            DE_result.nfev = nfev
-
-            if result.fun < DE_result.fun:
-                DE_result.fun = result.fun
-                DE_result.x = result.x
-                DE_result.jac = result.jac
-                # to keep internal state consistent
-                self.population_energies[0] = result.fun
-                self.population[0] = self._unscale_parameters(result.x)
+        initial = self._initial_population_members
+        return int(round(initial - self._reduction_progress
+                         * (initial - self.min_popsize)))
 
-        return DE_result
+    def _resize_population(self, size):
+        """
+        keep the `size` best members of the population. The population and
+        the archive become views of their first rows.
+        """
+        keep = self._order(self.population_energies,
+                           self.population_violations)[:size]
+        self.population[:size] = self.population[keep]
+        self.population_energies[:size] = self.population_energies[keep]
+        self.population_violations[:size] = self.population_violations[keep]
+
+        self.population = self.population[:size]
+        self.population_energies = self.population_energies[:size]
+        self.population_violations = self.population_violations[:size]
+        self.num_population_members = size
+
+        if self.archive is not None:
+            if self.archive_size > size:
+                rng = self.random_number_generator
+                keep = rng.permutation(self.archive_size)[:size]
+                self.archive[:size] = self.archive[keep]
+                self.archive_size = size
+            self.archive = self.archive[:size]
+
+    def save_checkpoint(self, path, nit, trials=None, restart=False):
+        """
+        Saves the state of the solver after `nit` generations to the ``.npz``
+        file `path`, replacing it atomically. `trials` are the trials already
+        created for the next generation, if any, and `restart` is whether the
+        minimization restarts after this generation.
+        """
+        state = dict(population=self.population,
+                     population_energies=self.population_energies,
+                     nit=nit,
+                     nfev=self._nfev,
+                     scale=self.scale,
+                     reduction_progress=self._reduction_progress,
+                     device_rows=self._device_rows,
+                     initial_popsize=self._initial_population_members,
+                     restarts=self._restarts,
+                     stagnant_generations=self._stagnant_generations,
+                     restart=restart,
+                     random_state=json.dumps(
+                         _get_random_state(self.random_number_generator),
+                         default=_to_json))
+        if trials is not None:
+            state['trials'] = trials
+        if self.constraints is not None:
+            state['population_violations'] = self.population_violations
+        if self._surrogate is not None:
+            surrogate = self._surrogate
+            state['surrogate_points'] = surrogate.points[:surrogate.count]
+            state['surrogate_energies'] = surrogate.energies[:surrogate.count]
+            state['surrogate_index'] = surrogate.index
+        if self.adaptive:
+            state['memory_scale'] = self.memory_scale
+            state['memory_recombination'] = self.memory_recombination
+            state['memory_index'] = self.memory_index
+            state['trial_scale'] = self._trial_scale
+            state['trial_recombination'] = self._trial_recombination
+        if self.archive is not None:
+            state['archive'] = self.archive[:self.archive_size]
+        if self._cache is not None:
+            keys = list(self._cache._energies)
+            state['cache_keys'] = np.frombuffer(
+                b''.join(keys),
+                dtype=np.dtype((np.void, len(keys[0]) if keys else 1)))
+            state['cache_energies'] = list(self._cache._energies.values())
+            state['cache_counts'] = [self._cache.hits, self._cache.misses]
+
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            np.savez(f, **state)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    def load_checkpoint(self, path):
+        """
+        Restores the state of the solver from the ``.npz`` file `path` saved
+        by `save_checkpoint`. The next call to `solve` or `ask` resumes from
+        it.
+        """
+        with np.load(path) as data:
+            size = len(data['population'])
+            if (self.population_reduction is not None
+                    and size < self.num_population_members):
+                self._resize_population(size)
+            elif self.restarts and size > self.num_population_members:
+                # the population grew at restarts.
+                self._allocate_population(size)
+            if 'initial_popsize' in data:
+                self._initial_population_members = int(
+                    data['initial_popsize'])
+            if data['population'].shape != self.population.shape:
+                raise ValueError('The checkpoint population has shape %s, '
+                                 'but the solver population has shape %s'
+                                 % (data['population'].shape,
+                                    self.population.shape))
+            self.population[:] = data['population']
+            self.population_energies[:] = data['population_energies']
+            if self.constraints is not None:
+                self.population_violations[:] = data['population_violations']
+            self.scale = data['scale'][()]
+            self._reduction_progress = float(data['reduction_progress'])
+            if self.max_batch == 'auto' and 'device_rows' in data:
+                # the chunks of the generations are those of the tuned size.
+                self._device_rows = int(data['device_rows'])
+                self.init_device_arrays()
+            _set_random_state(self.random_number_generator,
+                              json.loads(data['random_state'][()]))
+
+            self._resume = dict(nit=int(data['nit']),
+                                nfev=int(data['nfev']),
+                                restarts=0, stagnant_generations=0,
+                                restart=False)
+            if 'restarts' in data:
+                self._resume['restarts'] = int(data['restarts'])
+                self._resume['stagnant_generations'] = int(
+                    data['stagnant_generations'])
+            if 'restart' in data:
+                self._resume['restart'] = bool(data['restart'])
+            if 'trials' in data:
+                self._resume['trials'] = data['trials']
+
+            if self.adaptive:
+                self.memory_scale[:] = data['memory_scale']
+                self.memory_recombination[:] = data['memory_recombination']
+                self.memory_index = int(data['memory_index'])
+                self._trial_scale[:] = data['trial_scale']
+                self._trial_recombination[:] = data['trial_recombination']
+            if self.archive is not None:
+                self.archive_size = len(data['archive'])
+                self.archive[:self.archive_size] = data['archive']
+
+            if self._surrogate is not None and 'surrogate_points' in data:
+                surrogate = self._surrogate
+                surrogate.count = len(data['surrogate_energies'])
+                surrogate.points[:surrogate.count] = data['surrogate_points']
+                surrogate.energies[:surrogate.count] = (
+                    data['surrogate_energies'])
+                surrogate.index = int(data['surrogate_index'])
+
+            if self._cache is not None and 'cache_keys' in data:
+                self._cache._energies.clear()
+                self._cache.update(data['cache_keys'].tolist(),
+                                   data['cache_energies'])
+                self._cache.hits, self._cache.misses = data['cache_counts']
+
+    def _update_scale(self):
+        """
+        draw the mutation constant of the generation, when dithering.
+        """
+        if self.dither is not None:
+            self.scale = _random(self.random_number_generator) * (
+                self.dither[1] - self.dither[0]) + self.dither[0]
+
+    def _make_trials(self, candidates, trials, parameters):
+        """
+        create the trials of the `candidates` into `trials`, and their scaled
+        parameters into `parameters`.
+        """
+        with self._timer.phase('mutation'):
+            trials[:] = self._mutate(candidates)
+
+        # ensuring that it's in the range [0, 1)
+        with self._timer.phase('bounds'):
+            self._ensure_constraint(trials, candidates)
+
+        # scale from [0, 1) to the actual parameter value
+        with self._timer.phase('scaling'):
+            parameters[:] = self._scale_parameters(trials)
+
+    def _select(self, candidates, trials, energies, violations=None):
+        """
+        replace the `candidates` by their trials where the energy is lower,
+        or by feasibility rules given the `violations` of the trials, and put
+        the best solution into the best solution position.
+        """
+        with self._timer.phase('selection'):
+            self._replace(candidates, trials, energies, violations)
+
+            # if the trial candidate also has a lower energy than the
+            # best solution then replace that as well
+            minval = self._best_index(self.population_energies,
+                                      self.population_violations)
+            self._swap_best(minval)
+
+    def _replace(self, candidates, trials, energies, violations=None):
+        """
+        replace the `candidates` by their trials where the energy is lower, or
+        by feasibility rules given the `violations` of the trials, and return
+        where they were replaced.
+        """
+        # if the energy of the trial candidate is lower than the
+        # original population member then replace it
+        parent_energies = self.population_energies[candidates]
+        improved = self._improves(energies, violations, parent_energies,
+                                  self.population_violations[candidates])
+
+        if self.adaptive:
+            self._adapt(candidates[improved],
+                        parent_energies[improved] - energies[improved])
+        if self.archive is not None:
+            self._add_to_archive(self.population[candidates[improved]])
+
+        self.population[candidates[improved]] = trials[improved]
+        self.population_energies[candidates[improved]] = energies[improved]
+        if violations is not None:
+            self.population_violations[candidates[improved]] = (
+                violations[improved])
+        return improved
+
+    def _improves(self, energies, violations, parent_energies,
+                  parent_violations):
+        """
+        where the solutions of `energies` and `violations` improve on their
+        parents: by a lower violation, or by a lower energy at equal
+        violations. The energies alone are compared without constraints.
+        """
+        if self.constraints is None:
+            return energies < parent_energies
+        return ((violations < parent_violations)
+                | ((violations == parent_violations)
+                   & (energies < parent_energies)))
+
+    def _order(self, energies, violations):
+        """
+        the indices of the solutions of `energies` and `violations`, from the
+        best to the worst.
+        """
+        if self.constraints is None:
+            return np.argsort(energies)
+        return np.lexsort((energies, violations))
+
+    def _best_index(self, energies, violations):
+        """
+        the index of the best solution of `energies` and `violations`.
+        """
+        if self.constraints is None:
+            return np.argmin(energies)
+        least = np.flatnonzero(violations == np.min(violations))
+        return least[np.argmin(energies[least])]
+
+    def _violation(self, parameters):
+        """
+        the total violation of the constraints by each row of `parameters`,
+        zero where all of them are satisfied.
+        """
+        with self._timer.phase('constraints'):
+            violations = np.zeros(len(parameters))
+            for constraint in self.constraints:
+                values = np.asarray(constraint(parameters), dtype=np.float64)
+                values = values.reshape(len(parameters), -1)
+                violations += np.sum(np.maximum(values, 0.), axis=1)
+        return violations
 
     def _scale_parameters(self, trial):
         """
-        scale from a number between 0 and 1 to parameters
+        scale from a number between 0 and 1 to parameters, rounding the
+        integer ones.
         """
-        return self.__scale_arg1 + (trial - 0.5) * self.__scale_arg2
+        parameters = self.__scale_arg1 + (trial - 0.5) * self.__scale_arg2
+        if self.integrality is not None:
+            parameters[..., self.integrality] = np.round(
+                parameters[..., self.integrality])
+        return parameters
 
     def _unscale_parameters(self, parameters):
         """
@@ -450,62 +2138,96 @@ class DifferentialEvolutionSolver(object):
         """
         return (parameters - self.__scale_arg1) / self.__scale_arg2 + 0.5
 
-    def _ensure_constraint(self, trial):
+    def _ensure_constraint(self, trials, candidates):
         """
-        make sure the parameters lie between the limits
+        make sure the parameters lie between the limits. `trials` is modified
+        in place; the i-th trial descends from the parent `candidates[i]`.
         """
-        for index, param in enumerate(trial):
-            if param > 1 or param < 0:
-                trial[index] = self.random_number_generator.rand()
+        mask = (trials > 1) | (trials < 0)
+        if np.any(mask):
+            self.bounds_func(trials, candidates, mask)
 
-    def _mutate(self, candidate):
+    def _bounds_random(self, trials, candidates, mask):
         """
-        create a trial vector based on a mutation strategy
+        re-initialize the out-of-range parameters at random
         """
-        trial = np.copy(self.population[candidate])
+        trials[mask] = _random(self.random_number_generator,
+                               np.count_nonzero(mask))
 
+    def _bounds_clip(self, trials, candidates, mask):
+        """
+        move the out-of-range parameters onto the violated bound
+        """
+        np.clip(trials, 0, 1, out=trials)
+
+    def _bounds_reflect(self, trials, candidates, mask):
+        """
+        reflect the out-of-range parameters back at the violated bound
+        """
+        reflected = np.mod(trials[mask], 2)
+        trials[mask] = np.where(reflected > 1, 2 - reflected, reflected)
+
+    def _bounds_midpoint(self, trials, candidates, mask):
+        """
+        move the out-of-range parameters halfway between the parent and the
+        violated bound
+        """
+        parents = self.population[candidates]
+        trials[mask] = np.where(trials > 1, 0.5 * (parents + 1),
+                                0.5 * parents)[mask]
+
+    def _bounds_wrap(self, trials, candidates, mask):
+        """
+        wrap the out-of-range parameters around to the opposite bound
+        """
+        trials[mask] = np.mod(trials[mask], 1)
+
+    def _mutate(self, candidates):
+        """
+        create trial vectors for all the `candidates` at once, based on a
+        mutation strategy
+        """
         rng = self.random_number_generator
+        num_candidates = len(candidates)
 
-        fill_point = rng.randint(0, self.parameter_count)
+        trials = self.population[candidates]
 
-        if (self.strategy == 'randtobest1exp'
-                or self.strategy == 'randtobest1bin'):
-            bprime = self.mutation_func(candidate,
-                                        self._select_samples(candidate, 5))
-        else:
-            bprime = self.mutation_func(self._select_samples(candidate, 5))
+        fill_points = _integers(rng, 0, self.parameter_count, num_candidates)
+
+        recombination = self.cross_over_probability
+        if self.adaptive:
+            self.scale, recombination = self._sample_constants(candidates)
+
+        samples = self._select_samples(candidates, self.num_samples)
+        bprime = self.mutation_func(candidates, samples)
+
+        crossovers = _random(rng, (num_candidates, self.parameter_count))
+        crossovers = crossovers < recombination
 
         if self.strategy in self._binomial:
-            crossovers = rng.rand(self.parameter_count)
-            crossovers = crossovers < self.cross_over_probability
-            # the last one is always from the bprime vector for binomial
-            # If you fill in modulo with a loop you have to set the last one to
-            # true. If you don't use a loop then you can have any random entry
-            # be True.
-            crossovers[fill_point] = True
-            trial = np.where(crossovers, bprime, trial)
-            return trial
+            # the fill point is always from the bprime vector for binomial
+            crossovers[np.arange(num_candidates), fill_points] = True
 
         elif self.strategy in self._exponential:
-            i = 0
-            while (i < self.parameter_count and
-                   rng.rand() < self.cross_over_probability):
+            # starting from the fill point, consecutive parameters are taken
+            # from the bprime vector as long as the Bernoulli trials succeed,
+            # i.e. the length of the run is the number of leading successes.
+            lengths = np.cumprod(crossovers, axis=1).sum(axis=1)
+            offsets = (np.arange(self.parameter_count)
+                       - fill_points[:, np.newaxis]) % self.parameter_count
+            crossovers = offsets < lengths[:, np.newaxis]
 
-                trial[fill_point] = bprime[fill_point]
-                fill_point = (fill_point + 1) % self.parameter_count
-                i += 1
+        return np.where(crossovers, bprime, trials)
 
-            return trial
-
-    def _best1(self, samples):
+    def _best1(self, candidates, samples):
         """
         best1bin, best1exp
         """
         r0, r1 = samples[:2]
-        return (self.population[0] + self.scale *
+        return (self._best(candidates) + self.scale *
                 (self.population[r0] - self.population[r1]))
 
-    def _rand1(self, samples):
+    def _rand1(self, candidates, samples):
         """
         rand1bin, rand1exp
         """
@@ -513,70 +2235,283 @@ class DifferentialEvolutionSolver(object):
         return (self.population[r0] + self.scale *
                 (self.population[r1] - self.population[r2]))
 
-    def _randtobest1(self, candidate, samples):
+    def _randtobest1(self, candidates, samples):
         """
         randtobest1bin, randtobest1exp
         """
         r0, r1 = samples[:2]
-        bprime = np.copy(self.population[candidate])
-        bprime += self.scale * (self.population[0] - bprime)
+        bprime = self.population[candidates]
+        bprime += self.scale * (self._best(candidates) - bprime)
         bprime += self.scale * (self.population[r0] -
                                 self.population[r1])
         return bprime
 
-    def _best2(self, samples):
+    def _best2(self, candidates, samples):
         """
         best2bin, best2exp
         """
         r0, r1, r2, r3 = samples[:4]
-        bprime = (self.population[0] + self.scale *
+        bprime = (self._best(candidates) + self.scale *
                   (self.population[r0] + self.population[r1]
                    - self.population[r2] - self.population[r3]))
 
         return bprime
 
-    def _rand2(self, samples):
+    def _rand2(self, candidates, samples):
         """
         rand2bin, rand2exp
         """
-        r0, r1, r2, r3, r4 = samples
+        r0, r1, r2, r3, r4 = samples[:5]
         bprime = (self.population[r0] + self.scale *
                   (self.population[r1] + self.population[r2] -
                    self.population[r3] - self.population[r4]))
 
         return bprime
 
-    def _select_samples(self, candidate, number_samples):
+    def _currenttopbest1(self, candidates, samples):
+        """
+        currenttopbest1bin, currenttopbest1exp
+        """
+        r0, r1 = samples[:2]
+        bprime = self.population[candidates]
+        bprime += self.scale * (self._pbest(candidates) - bprime)
+        bprime += self.scale * (self.population[r0] -
+                                self._archive_donors(r1))
+        return bprime
+
+    def _best(self, candidates):
+        """
+        the best solution, for each of the `candidates`.
+        """
+        return self.population[0]
+
+    def _pbest(self, candidates):
+        """
+        a solution drawn from the `pbest` fraction of the best solutions, for
+        each of the `candidates`, ranked by feasibility first.
+        """
+        rng = self.random_number_generator
+        count = max(1, int(round(self.pbest * len(self.population))))
+        best = self._order(self.population_energies,
+                           self.population_violations)[:count]
+        choices = _integers(rng, 0, count, len(candidates))
+        return self.population[best[choices]]
+
+    def _archive_donors(self, samples):
+        """
+        the population members `samples`, of which a share proportional to
+        the size of the archive is replaced by archived solutions.
+        """
+        donors = self.population[samples]
+        if self.archive is None or not self.archive_size:
+            return donors
+
+        rng = self.random_number_generator
+        # the samples exclude the candidate and one other member.
+        archived = (_random(rng, len(samples))
+                    * (self.num_population_members - 2 + self.archive_size)
+                    < self.archive_size)
+        donors[archived] = self.archive[
+            _integers(rng, 0, self.archive_size, np.count_nonzero(archived))]
+        return donors
+
+    def _sample_constants(self, candidates):
+        """
+        draw the mutation and recombination constants of the `candidates`
+        from the memory, and return them as column vectors.
+        """
+        rng = self.random_number_generator
+        num_candidates = len(candidates)
+        memory = _integers(rng, 0, len(self.memory_scale), num_candidates)
+
+        recombination = np.clip(
+            rng.normal(self.memory_recombination[memory], 0.1), 0, 1)
+
+        # the mutation constant is drawn again until it is positive.
+        scale = np.zeros(num_candidates)
+        redraw = np.arange(num_candidates)
+        while len(redraw):
+            scale[redraw] = (self.memory_scale[memory[redraw]] + 0.1 *
+                             rng.standard_cauchy(len(redraw)))
+            redraw = redraw[scale[redraw] <= 0]
+        scale = np.minimum(scale, 1)
+
+        self._trial_scale[candidates] = scale
+        self._trial_recombination[candidates] = recombination
+        return scale[:, np.newaxis], recombination[:, np.newaxis]
+
+    def _adapt(self, candidates, improvements):
+        """
+        update the next memory entry with the weighted means of the constants
+        of the `candidates` whose trials improved by `improvements`.
+        """
+        if not len(candidates):
+            return
+
+        # the improvements by feasibility rules may not be positive.
+        if np.all(np.isfinite(improvements)) and np.all(improvements > 0):
+            weights = improvements / np.sum(improvements)
+        else:
+            weights = np.full(len(candidates), 1. / len(candidates))
+
+        scale = self._trial_scale[candidates]
+        recombination = self._trial_recombination[candidates]
+
+        # Lehmer mean for the mutation constant, arithmetic mean for the
+        # recombination constant.
+        index = self.memory_index
+        self.memory_scale[index] = (np.sum(weights * scale ** 2) /
+                                    np.sum(weights * scale))
+        self.memory_recombination[index] = np.sum(weights * recombination)
+        self.memory_index = (index + 1) % len(self.memory_scale)
+
+    def _add_to_archive(self, solutions):
+        """
+        add `solutions` to the archive, replacing archived solutions at
+        random once it is full.
+        """
+        capacity = len(self.archive)
+        count = min(len(solutions), capacity - self.archive_size)
+        self.archive[self.archive_size:self.archive_size + count] = \
+            solutions[:count]
+        self.archive_size += count
+
+        solutions = solutions[count:]
+        if len(solutions):
+            rng = self.random_number_generator
+            self.archive[_integers(rng, 0, capacity, len(solutions))] = \
+                solutions
+
+    def _select_samples(self, candidates, number_samples):
         """
         obtain random integers from range(self.num_population_members),
-        without replacement.  You can't have the original candidate either.
+        without replacement, for each of the `candidates`. You can't have the
+        original candidate either.
+
+        The samples are returned as an array of shape
+        ``(number_samples, len(candidates))``.
         """
-        idxs = list(range(self.num_population_members))
-        idxs.remove(candidate)
-        self.random_number_generator.shuffle(idxs)
-        idxs = idxs[:number_samples]
-        return idxs
+        rng = self.random_number_generator
+        num_candidates = len(candidates)
+
+        # the j-th sample is drawn from the members that are still available,
+        # all the draws at once.
+        available = self.num_population_members - 1 - np.arange(number_samples)
+        samples = (_random(rng, (number_samples, num_candidates))
+                   * available[:, np.newaxis]).astype(np.intp)
+
+        excluded = np.asarray(candidates, dtype=np.intp)[np.newaxis, :]
+        for j in range(number_samples):
+            # shift the draw past each of the excluded members in ascending
+            # order.
+            sample = samples[j]
+            for index in np.sort(excluded, axis=0):
+                sample += sample >= index
+            excluded = np.concatenate((excluded, sample[np.newaxis, :]))
+        return samples
 
     def _swap_best(self, i):
         """
         put the i-th solution into the best solution position.
         """
         self.population_energies[[0, i]] = self.population_energies[[i, 0]]
+        self.population_violations[[0, i]] = self.population_violations[[i, 0]]
         self.population[[0, i], :] = self.population[[i, 0], :]
 
 
+def _integers(rng, low, high=None, size=None):
+    """Draw integers from [low, high) with either a np.random.Generator or a
+    np.random.RandomState."""
+    if isinstance(rng, np.random.Generator):
+        return rng.integers(low, high, size)
+    return rng.randint(low, high, size)
+
+
+def _random(rng, size=None):
+    """Draw floats from [0, 1) with either a np.random.Generator or a
+    np.random.RandomState."""
+    if isinstance(rng, np.random.Generator):
+        return rng.random(size)
+    return rng.random_sample(size)
+
+
+def _get_random_state(rng):
+    """Return the state of the random number generator `rng` as a dict."""
+    if isinstance(rng, np.random.Generator):
+        return rng.bit_generator.state
+    return rng.get_state(legacy=False)
+
+
+def _set_random_state(rng, state):
+    """Restore the state of the random number generator `rng` from a dict
+    returned by `_get_random_state`."""
+    if isinstance(rng, np.random.Generator):
+        # the arrays of the state, e.g. of Philox, were saved as lists.
+        bit_generator = rng.bit_generator
+        template = bit_generator.state
+        for key, value in template.items():
+            if isinstance(value, dict):
+                for name, item in value.items():
+                    if isinstance(item, np.ndarray):
+                        state[key][name] = np.asarray(state[key][name],
+                                                      dtype=item.dtype)
+        bit_generator.state = state
+        return
+    state['state']['key'] = np.asarray(state['state']['key'], dtype=np.uint32)
+    rng.set_state(state)
+
+
+def _memmap_empty(shape, dtype, path):
+    """
+    an array of `shape` and `dtype` in a memory-mapped file at `path`, or in
+    a temporary file if `path` is True, and the temporary file, or None.
+    """
+    temporary = None
+    if path is True:
+        path = temporary = tempfile.TemporaryFile()
+    return np.memmap(path, dtype=dtype, mode='w+', shape=shape), temporary
+
+
+def _to_json(obj):
+    """Convert the numpy objects found in a random state for json."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError('%r is not JSON serializable' % obj)
+
+
 def _make_random_gen(seed):
-    """Turn seed into a np.random.RandomState instance
+    """Turn seed into a random number generator
     If seed is None, return the RandomState singleton used by np.random.
-    If seed is an int, return a new RandomState instance seeded with seed.
-    If seed is already a RandomState instance, return it.
+    If seed is an int or a SeedSequence, return a new Generator instance
+    (PCG64) seeded with seed.
+    If seed is already a Generator or a RandomState instance, return it.
     Otherwise raise ValueError.
     """
     if seed is None or seed is np.random:
         return np.random.mtrand._rand
-    if isinstance(seed, (numbers.Integral, np.integer)):
-        return np.random.RandomState(seed)
-    if isinstance(seed, np.random.RandomState):
+    if isinstance(seed, (numbers.Integral, np.integer,
+                         np.random.SeedSequence)):
+        return np.random.Generator(np.random.PCG64(seed))
+    if isinstance(seed, (np.random.Generator, np.random.RandomState)):
         return seed
-    raise ValueError('%r cannot be used to seed a numpy.random.RandomState'
+    raise ValueError('%r cannot be used to seed a numpy.random.Generator'
                      ' instance' % seed)
+
+
+def _spawn_seeds(seed, count):
+    """Return `count` independent SeedSequences derived from seed, for the
+    random number generators of parallel runs.
+    If seed is a Generator, its own streams are spawned. If seed is a
+    RandomState instance, the entropy of the SeedSequences is drawn from it.
+    """
+    if isinstance(seed, np.random.Generator):
+        bit_generator = seed.bit_generator
+        seed = getattr(bit_generator, 'seed_seq', None) or \
+            bit_generator._seed_seq
+    elif isinstance(seed, np.random.RandomState):
+        seed = seed.randint(2 ** 31)
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return seed.spawn(count)
@@ -0,0 +1,276 @@
+"""
+differential_evolution_islands: differential evolution of several populations
+in separate processes, with periodic migration of their best members.
+
+Each island runs a `DifferentialEvolutionSolver` in its own process, with its
+own backend. Every `migration_interval` generations, the islands send their
+best members to the parent process through pipes, and receive the best
+members of their neighbours on the migration topology in return.
+"""
+from __future__ import division, print_function, absolute_import
+import multiprocessing
+import os
+
+import numpy as np
+from scipy.optimize import OptimizeResult
+
+from ._differentialevolution import DifferentialEvolutionSolver, _spawn_seeds
+
+__all__ = ['differential_evolution_islands']
+
+_topologies = ('ring', 'complete')
+
+
+def differential_evolution_islands(func, bounds, n_islands=4, args=(),
+                                   migration_interval=10, migration_size=1,
+                                   topology='ring', seed=None, backend=None,
+                                   **kwargs):
+    """Finds the global minimum of a multivariate function with an island
+    model.
+
+    `n_islands` populations are evolved independently, each in its own
+    process, and exchange their best members periodically. The islands
+    explore different basins of multimodal functions, and evaluate their
+    populations in parallel.
+
+    Parameters
+    ----------
+    func : callable
+        The objective function, as in `differential_evolution`. `func`, `args`
+        and the callables among the other arguments must be picklable, as
+        they are sent to the processes of the islands.
+    bounds : sequence
+        Bounds for variables. See `differential_evolution`.
+    n_islands : int, optional
+        The number of islands, i.e. of processes.
+    migration_interval : int, optional
+        The number of generations between migrations.
+    migration_size : int, optional
+        The number of best members each island sends at each migration. The
+        immigrants replace the worst members of the receiving island, where
+        they improve on them.
+    topology : str, optional
+        The islands from which each island receives immigrants. Should be one
+        of:
+            - 'ring': the previous island, i.e. island ``i`` receives from
+              island ``i - 1``
+            - 'complete': all the other islands, of which the
+              `migration_size` best emigrants are kept
+    seed : int, SeedSequence, Generator or RandomState, optional
+        The seed from which an independent stream of random numbers is
+        spawned for each island, so that the minimization is repeatable
+        whatever the number of processors.
+    backend : string or `Backend`, or a sequence of them, optional
+        The backend of every island, or one backend for each island, e.g. to
+        place the islands on different devices. Each island creates its
+        backend in its own process.
+
+    The other parameters are as in `differential_evolution`, and apply to
+    every island. Each island saves its checkpoints to its own file, whose
+    name is that of `checkpoint_path` with the index of the island before
+    the extension, e.g. ``run.2.npz``, and is resumed from its own file of
+    `resume` likewise.
+
+    Returns
+    -------
+    res : OptimizeResult
+        The optimization result of the island with the lowest energy, or
+        with the lowest violation of the `constraints` first, if any, with
+        ``nfev`` the total number of function evaluations of all the islands,
+        ``nit`` the largest number of generations, and ``islands`` the
+        results of all the islands.
+    """
+    if topology not in _topologies:
+        raise ValueError("The topology must be one of %s"
+                         % ", ".join(_topologies))
+    if n_islands < 1:
+        raise ValueError("The number of islands must be positive")
+    if migration_interval < 1 or migration_size < 1:
+        raise ValueError("The migration interval and size must be positive")
+
+    if isinstance(backend, (list, tuple)):
+        if len(backend) != n_islands:
+            raise ValueError("One backend must be given for each island")
+        backends = list(backend)
+    else:
+        backends = [backend] * n_islands
+
+    # the processes are spawned rather than forked, so that each island can
+    # initialize its own device context.
+    context = multiprocessing.get_context('spawn')
+    connections, processes = [], []
+    results = None
+    try:
+        for island, island_seed in enumerate(_spawn_seeds(seed, n_islands)):
+            connection, child = context.Pipe()
+            process = context.Process(
+                target=_run_island,
+                args=(child, island, func, bounds, args, island_seed,
+                      backends[island], migration_interval, migration_size,
+                      kwargs))
+            process.start()
+            child.close()
+            connections.append(connection)
+            processes.append(process)
+
+        results = _coordinate(connections, topology, migration_size)
+    finally:
+        for process in processes:
+            # the islands are stopped when any of them fails.
+            if results is None:
+                process.terminate()
+            process.join()
+        for connection in connections:
+            connection.close()
+
+    # the islands are ranked by the violation of the constraints, if any,
+    # and then by energy.
+    best = min(range(n_islands),
+               key=lambda island: (results[island].get('constr_violation', 0),
+                                   results[island].fun))
+    result = OptimizeResult(
+        x=results[best].x,
+        fun=results[best].fun,
+        nfev=sum(result.nfev for result in results),
+        nit=max(result.nit for result in results),
+        message=results[best].message,
+        success=results[best].success,
+        islands=results)
+    if 'constr_violation' in results[best]:
+        result.constr_violation = results[best].constr_violation
+    return result
+
+
+def _coordinate(connections, topology, size):
+    """
+    route the emigrants of the islands behind `connections` until all the
+    islands are done, and return their results.
+
+    The islands migrate in rounds: in each round, every island still running
+    either migrates, or sends its result and leaves.
+    """
+    n_islands = len(connections)
+    results = [None] * n_islands
+    emigrants = [None] * n_islands
+
+    running = list(range(n_islands))
+    while running:
+        migrating = []
+        for island in running:
+            message = connections[island].recv()
+            if message[0] == 'error':
+                raise message[1]
+            if message[0] == 'done':
+                results[island] = message[1]
+            else:
+                emigrants[island] = message[1:]
+                migrating.append(island)
+
+        for island in migrating:
+            if topology == 'ring':
+                sources = [(island - 1) % n_islands]
+            else:
+                sources = range(n_islands)
+            sources = [source for source in sources
+                       if source != island and emigrants[source] is not None]
+
+            if sources:
+                rows = np.concatenate([emigrants[source][0]
+                                       for source in sources])
+                energies = np.concatenate([emigrants[source][1]
+                                           for source in sources])
+                violations = np.concatenate([emigrants[source][2]
+                                             for source in sources])
+                best = np.lexsort((energies, violations))[:size]
+                rows, energies = rows[best], energies[best]
+                violations = violations[best]
+            else:
+                rows, energies = np.empty((0, 0)), np.empty(0)
+                violations = np.empty(0)
+            connections[island].send((rows, energies, violations))
+        running = migrating
+    return results
+
+
+class _Migration(object):
+    """
+    Hook of the solver of an island, exchanging the `size` best members of
+    the population of `solver` through `connection` every `interval`
+    generations, at their end.
+    """
+    def __init__(self, connection, interval, size):
+        self.connection = connection
+        self.interval = interval
+        self.size = size
+        self.solver = None
+
+    def __call__(self, step):
+        if step % self.interval:
+            return
+        solver = self.solver
+        if solver.pipeline:
+            # the trials of the next generation are drawn from the population.
+            solver._pending.result()
+
+        energies = solver.population_energies
+        violations = solver.population_violations
+        count = min(self.size, solver.num_population_members - 1)
+        order = solver._order(energies, violations)
+        best = order[:count]
+        self.connection.send(('migrate', solver.population[best],
+                              energies[best], violations[best]))
+
+        rows, immigrant_energies, immigrant_violations = (
+            self.connection.recv())
+        if not len(rows):
+            return
+        rows, immigrant_energies = rows[:count], immigrant_energies[:count]
+        immigrant_violations = immigrant_violations[:count]
+
+        # the immigrants replace the worst members they improve on.
+        worst = order[::-1][:len(rows)]
+        improved = solver._improves(immigrant_energies, immigrant_violations,
+                                    energies[worst], violations[worst])
+        solver.population[worst[improved]] = rows[improved]
+        energies[worst[improved]] = immigrant_energies[improved]
+        violations[worst[improved]] = immigrant_violations[improved]
+        solver._swap_best(solver._best_index(energies, violations))
+
+
+def _island_path(path, island):
+    """
+    the file of the checkpoints of `island`, named after `path`.
+    """
+    if path is None:
+        return None
+    root, ext = os.path.splitext(path)
+    return '%s.%d%s' % (root, island, ext)
+
+
+def _run_island(connection, island, func, bounds, args, seed, backend,
+                interval, size, kwargs):
+    """
+    evolve the population of `island`, migrating through `connection`.
+    """
+    try:
+        # the islands would otherwise replace each other's checkpoints.
+        kwargs['checkpoint_path'] = _island_path(
+            kwargs.get('checkpoint_path'), island)
+        resume = _island_path(kwargs.pop('resume', None), island)
+
+        migration = _Migration(connection, interval, size)
+        with DifferentialEvolutionSolver(func, bounds, args=args, seed=seed,
+                                         backend=backend,
+                                         **kwargs) as solver:
+            # the migration comes before the checkpoint of the generation,
+            # so that the islands are resumed after it.
+            migration.solver = solver
+            solver._migration = migration
+            if resume is not None:
+                solver.load_checkpoint(resume)
+            result = solver.solve()
+        connection.send(('done', result))
+    except Exception as error:
+        connection.send(('error', error))
+    finally:
+        connection.close()
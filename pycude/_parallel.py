@@ -0,0 +1,114 @@
+"""
+Evaluation of scalar objective functions across a pool of worker processes.
+
+The parameters of the population are placed in a shared memory block, from
+which each worker process reads its chunk of rows, so that no candidate is
+pickled on its way to the workers; only the energies are sent back.
+"""
+from __future__ import division, print_function, absolute_import
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+__all__ = []
+
+# Number of chunks dispatched to each worker per evaluation. More than one
+# chunk per worker balances the load when the cost of `func` varies.
+_CHUNKS_PER_WORKER = 4
+
+# State of a worker process, set by `_init_worker`.
+_worker_func = None
+_worker_args = ()
+_worker_blocks = {}
+
+
+def _init_worker(func, args):
+    global _worker_func, _worker_args
+    _worker_func = func
+    _worker_args = args
+
+
+def _evaluate_chunk(name, shape, dtype, start, stop):
+    """
+    evaluate the objective function on the rows ``start:stop`` of the matrix
+    of `shape` held by the shared memory block `name`.
+    """
+    if name not in _worker_blocks:
+        # a block is replaced only when it is outgrown, so stale attachments
+        # are few; they are released when the worker exits.
+        _worker_blocks[name] = shared_memory.SharedMemory(name=name)
+    block = _worker_blocks[name]
+    parameters = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    return [_worker_func(x, *_worker_args) for x in parameters[start:stop]]
+
+
+def _evaluate_vector(x):
+    return _worker_func(x, *_worker_args)
+
+
+class _PoolEvaluator(object):
+    """
+    Wraps a scalar objective function ``f(x, *args)`` into a batched one
+    ``F(X, *args)`` that evaluates the rows of the matrix ``X`` across a pool
+    of `workers` processes.
+    """
+    def __init__(self, func, args, workers):
+        if workers == -1:
+            workers = os.cpu_count()
+        self.workers = workers
+        self._executor = ProcessPoolExecutor(max_workers=workers,
+                                             initializer=_init_worker,
+                                             initargs=(func, args))
+        self._block = None
+        self._capacity = 0
+
+    def __call__(self, X):
+        num_rows = len(X)
+        parameters = self._reserve(X.shape, X.dtype)
+        np.copyto(parameters, X)
+
+        chunksize = max(1, -(-num_rows // (self.workers * _CHUNKS_PER_WORKER)))
+        starts = range(0, num_rows, chunksize)
+        futures = [self._executor.submit(_evaluate_chunk, self._block.name,
+                                         X.shape, X.dtype.str, start,
+                                         min(start + chunksize, num_rows))
+                   for start in starts]
+
+        energies = np.empty(num_rows)
+        for start, future in zip(starts, futures):
+            chunk = future.result()
+            energies[start:start + len(chunk)] = chunk
+        return energies
+
+    def submit(self, x):
+        """
+        evaluate the objective function on the vector `x` in the background,
+        and return the future of its energy.
+        """
+        return self._executor.submit(_evaluate_vector, x)
+
+    def _reserve(self, shape, dtype):
+        """
+        return a C-ordered matrix of `shape` in the shared memory block,
+        replacing the block if it is too small.
+        """
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if size > self._capacity:
+            self._release()
+            self._block = shared_memory.SharedMemory(create=True,
+                                                     size=max(size, 1))
+            self._capacity = size
+        return np.ndarray(shape, dtype=dtype, buffer=self._block.buf)
+
+    def _release(self):
+        if self._block is not None:
+            self._block.close()
+            self._block.unlink()
+            self._block = None
+            self._capacity = 0
+
+    def close(self):
+        self._executor.shutdown()
+        self._release()
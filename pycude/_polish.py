@@ -0,0 +1,142 @@
+"""
+Local refinement of the best members of the population.
+
+The members are refined together in the unit hypercube of the population: at
+each iteration, the points probed around all of them are evaluated in a single
+call of `evaluate`, which maps the rows of a 2-D array to their energies.
+"""
+from __future__ import division, print_function, absolute_import
+import numpy as np
+
+__all__ = []
+
+# The initial step of the searches, as a fraction of the bounds.
+_INITIAL_STEP = 0.1
+
+# The number of step lengths tried at once along the descent direction.
+_LINE_POINTS = 8
+
+
+def _polish_gradient(evaluate, x, energies, maxiter=100, tol=1e-8,
+                     eps=np.finfo(np.float64).eps):
+    """
+    Projected steepest descent from each row of `x`, whose energies are
+    `energies`. Each iteration makes two calls of `evaluate`: one for the
+    central differences of the gradients of all the members, with a step of
+    ``eps ** (1 / 3)`` for parameters of machine epsilon `eps`, and one for
+    `_LINE_POINTS` halving steps along each descent direction. A member stops
+    when no step improves on it and the step falls below `tol` or `eps`.
+
+    Returns the refined members, their energies, and the gradients estimated
+    at the last iteration.
+    """
+    x = np.array(x, dtype=np.float64)
+    energies = np.array(energies, dtype=np.float64)
+    count, dim = x.shape
+    difference_step = eps ** (1. / 3)
+    tol = max(tol, eps)
+
+    step = np.full(count, _INITIAL_STEP)
+    gradient = np.zeros_like(x)
+    diagonal = np.arange(dim)
+    halvings = 0.5 ** np.arange(_LINE_POINTS)
+
+    active = np.arange(count)
+    for _ in range(maxiter):
+        if not len(active):
+            break
+        rows = np.arange(len(active))
+        start = x[active]
+
+        # the 2 * dim points of the central differences of every member.
+        upper = np.repeat(start[:, np.newaxis], dim, axis=1)
+        lower = upper.copy()
+        upper[:, diagonal, diagonal] += difference_step
+        lower[:, diagonal, diagonal] -= difference_step
+        np.clip(upper, 0., 1., out=upper)
+        np.clip(lower, 0., 1., out=lower)
+
+        probes = evaluate(np.concatenate((upper, lower), axis=1)
+                          .reshape(-1, dim)).reshape(-1, 2, dim)
+        widths = (upper - lower)[:, diagonal, diagonal]
+        slopes = (probes[:, 0] - probes[:, 1]) / widths
+        slopes[~np.isfinite(slopes)] = 0.
+        gradient[active] = slopes
+
+        norms = np.linalg.norm(slopes, axis=1)
+        moving = norms > 0
+        direction = -slopes / np.where(moving, norms, 1.)[:, np.newaxis]
+
+        # the steps along each descent direction, projected onto the bounds.
+        lengths = step[active][:, np.newaxis] * halvings
+        line = np.clip(start[:, np.newaxis]
+                       + lengths[..., np.newaxis] * direction[:, np.newaxis],
+                       0., 1.)
+        line_energies = evaluate(line.reshape(-1, dim)).reshape(
+            -1, _LINE_POINTS)
+        line_energies[np.isnan(line_energies)] = np.inf
+
+        best = np.argmin(line_energies, axis=1)
+        improved = moving & (line_energies[rows, best] < energies[active])
+
+        members = active[improved]
+        x[members] = line[rows[improved], best[improved]]
+        energies[members] = line_energies[rows[improved], best[improved]]
+        step[members] = np.minimum(2. * lengths[rows[improved],
+                                                best[improved]], 1.)
+        step[active[~improved]] = 0.5 * lengths[~improved, -1]
+
+        active = active[moving & (step[active] >= tol)]
+
+    return x, energies, gradient
+
+
+def _polish_pattern(evaluate, x, energies, maxiter=100, tol=1e-8,
+                    eps=np.finfo(np.float64).eps):
+    """
+    Compass search from each row of `x`, whose energies are `energies`. Each
+    iteration polls the 2 * dim points one step away from every member along
+    each parameter, in a single call of `evaluate`, and moves each member to
+    its best poll point if it improves on it, or halves its step otherwise. A
+    member stops when its step falls below `tol`, or below the machine
+    epsilon `eps` of the parameters.
+
+    Returns the refined members, their energies, and None.
+    """
+    x = np.array(x, dtype=np.float64)
+    energies = np.array(energies, dtype=np.float64)
+    count, dim = x.shape
+    tol = max(tol, eps)
+
+    step = np.full(count, _INITIAL_STEP)
+    identity = np.eye(dim)
+    directions = np.concatenate((identity, -identity))
+
+    active = np.arange(count)
+    for _ in range(maxiter):
+        if not len(active):
+            break
+        rows = np.arange(len(active))
+
+        poll = np.clip(x[active][:, np.newaxis]
+                       + step[active][:, np.newaxis, np.newaxis] * directions,
+                       0., 1.)
+        poll_energies = evaluate(poll.reshape(-1, dim)).reshape(-1, 2 * dim)
+        poll_energies[np.isnan(poll_energies)] = np.inf
+
+        best = np.argmin(poll_energies, axis=1)
+        improved = poll_energies[rows, best] < energies[active]
+
+        members = active[improved]
+        x[members] = poll[rows[improved], best[improved]]
+        energies[members] = poll_energies[rows[improved], best[improved]]
+        step[active[~improved]] *= 0.5
+
+        active = active[step[active] >= tol]
+
+    return x, energies, None
+
+
+# Dispatch of polishing method.
+_POLISH_METHODS = {'gradient': _polish_gradient,
+                   'pattern': _polish_pattern}
@@ -0,0 +1,92 @@
+"""
+Timers of the phases of the generations of the solver.
+"""
+from __future__ import division, print_function, absolute_import
+from timeit import default_timer
+
+__all__ = []
+
+
+class _Phase(object):
+    """
+    Context manager adding the time spent in it to the phase `name` of the
+    current generation of `timer`.
+    """
+    __slots__ = ('timer', 'name', 'start')
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = default_timer()
+
+    def __exit__(self, *args):
+        self.timer.add(self.name, default_timer() - self.start)
+
+
+class _NullPhase(object):
+    """
+    Context manager doing nothing.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *args):
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _NullTimer(object):
+    """
+    Timer used when profiling is disabled.
+    """
+    enabled = False
+
+    def phase(self, name):
+        return _NULL_PHASE
+
+    def end_generation(self, step):
+        pass
+
+
+class _Timer(object):
+    """
+    Accumulates the time spent in each phase of a generation into a record,
+    i.e. a dict from phase names to seconds, which also holds the wall-clock
+    time of the whole generation as 'total'. At the end of each generation,
+    the record is appended to `records`, added to `totals`, and passed to
+    `hook(step=i, record=r)`, if any.
+    """
+    enabled = True
+
+    def __init__(self, hook=None):
+        self.hook = hook
+        self.records = []
+        self.totals = {}
+        self._record = {}
+        self._start = default_timer()
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def add(self, name, seconds):
+        self._record[name] = self._record.get(name, 0.) + seconds
+
+    def end_generation(self, step):
+        now = default_timer()
+        record = self._record
+        record['total'] = now - self._start
+        self._record = {}
+        self._start = now
+
+        self.records.append(record)
+        for name, seconds in record.items():
+            self.totals[name] = self.totals.get(name, 0.) + seconds
+
+        if self.hook is not None:
+            self.hook(step=step, record=record)
@@ -0,0 +1,106 @@
+"""
+Surrogate models of the objective function, predicting the energies of the
+trials from an archive of the points already evaluated.
+
+The points are those of the unit hypercube of the population, and the
+predictions are used to rank the trials, not to replace their energies.
+"""
+from __future__ import division, print_function, absolute_import
+import numpy as np
+from scipy.spatial import cKDTree
+try:
+    from scipy.interpolate import RBFInterpolator
+except ImportError:
+    RBFInterpolator = None
+
+__all__ = []
+
+# The number of nearest points of the archive the predictions are made from.
+_KNN_NEIGHBORS = 5
+_RBF_NEIGHBORS = 30
+
+# The smoothing of the RBF interpolation, which keeps it defined when the
+# archive holds duplicate points.
+_RBF_SMOOTHING = 1e-10
+
+
+def _predict_knn(points, energies, queries):
+    """
+    Predicts the energies of the rows of `queries` by the inverse distance
+    weighted mean of the energies of their nearest `points`.
+    """
+    count = min(_KNN_NEIGHBORS, len(points))
+    distances, nearest = cKDTree(points).query(queries, k=count)
+    distances = distances.reshape(len(queries), count)
+    nearest = nearest.reshape(len(queries), count)
+
+    weights = 1. / np.maximum(distances, np.finfo(np.float64).eps)
+    return (np.sum(weights * energies[nearest], axis=1)
+            / np.sum(weights, axis=1))
+
+
+def _predict_rbf(points, energies, queries):
+    """
+    Predicts the energies of the rows of `queries` by thin plate spline
+    interpolation of the energies of their nearest `points`.
+    """
+    if RBFInterpolator is None:
+        raise ImportError("The 'rbf' surrogate requires "
+                          "scipy.interpolate.RBFInterpolator")
+    # the linear polynomial of the spline needs more points than parameters.
+    count = min(max(_RBF_NEIGHBORS, points.shape[1] + 2), len(points))
+    interpolator = RBFInterpolator(points, energies, neighbors=count,
+                                   smoothing=_RBF_SMOOTHING)
+    return interpolator(queries)
+
+
+# Dispatch of surrogate model.
+_SURROGATE_METHODS = {'knn': _predict_knn,
+                      'rbf': _predict_rbf}
+
+
+class _Surrogate(object):
+    """
+    Archive of the last `size` points evaluated, with their energies, on which
+    the energies of other points are predicted by the model `method`.
+    """
+    def __init__(self, method, dim, size):
+        if method not in _SURROGATE_METHODS:
+            raise ValueError("The surrogate must be one of %s"
+                             % ", ".join(sorted(_SURROGATE_METHODS)))
+        if size < 1:
+            raise ValueError('The surrogate archive size must be positive')
+        self.predict_func = _SURROGATE_METHODS[method]
+        self.points = np.zeros((size, dim))
+        self.energies = np.zeros(size)
+        self.count = 0
+        self.index = 0
+
+    @property
+    def ready(self):
+        """
+        whether the archive holds enough points for the predictions.
+        """
+        return self.count > self.points.shape[1] + 1
+
+    def update(self, points, energies):
+        """
+        add the rows of `points`, of finite `energies`, to the archive,
+        replacing the oldest ones.
+        """
+        finite = np.isfinite(energies)
+        size = len(self.energies)
+        points, energies = points[finite][-size:], energies[finite][-size:]
+
+        slots = (self.index + np.arange(len(energies))) % size
+        self.points[slots] = points
+        self.energies[slots] = energies
+        self.index = (self.index + len(energies)) % size
+        self.count = min(self.count + len(energies), size)
+
+    def predict(self, queries):
+        """
+        the predicted energies of the rows of `queries`.
+        """
+        return self.predict_func(self.points[:self.count],
+                                 self.energies[:self.count], queries)
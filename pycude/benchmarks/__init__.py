@@ -0,0 +1,10 @@
+"""
+Benchmarks of `differential_evolution` on standard test functions, run on CPU
+with the 'numpy' backend::
+
+    python -m pycude.benchmarks --dimensions 2 10 --output report.json
+    python -m pycude.benchmarks --baseline report.json
+"""
+from ._functions import (TestFunction, FUNCTIONS, sphere, rosenbrock,
+                         rastrigin, ackley, griewank, schwefel)
+from ._runner import run_benchmarks, format_report, compare_reports
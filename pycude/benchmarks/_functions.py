@@ -0,0 +1,67 @@
+"""
+Standard test functions, vectorized over a batch of candidates.
+
+Each function takes a 2-D array ``X`` of shape ``(popsize, ndim)``, one
+candidate per row, and returns the energies of the candidates. They run with
+the 'numpy' backend and the 'matrix' layout of `differential_evolution`.
+"""
+from __future__ import division, print_function, absolute_import
+from collections import namedtuple
+
+import numpy as np
+
+__all__ = ['TestFunction', 'FUNCTIONS', 'sphere', 'rosenbrock', 'rastrigin',
+           'ackley', 'griewank', 'schwefel']
+
+
+TestFunction = namedtuple('TestFunction', ['name', 'func', 'lower', 'upper',
+                                           'minimum'])
+TestFunction.__doc__ = """\
+A test function `func` with the bounds ``(lower, upper)`` of every parameter,
+and its global minimum."""
+
+
+def sphere(X):
+    X = np.asarray(X)
+    return np.sum(X ** 2, axis=1)
+
+
+def rosenbrock(X):
+    X = np.asarray(X)
+    return np.sum(100. * (X[:, 1:] - X[:, :-1] ** 2) ** 2
+                  + (1. - X[:, :-1]) ** 2, axis=1)
+
+
+def rastrigin(X):
+    X = np.asarray(X)
+    return (10. * X.shape[1]
+            + np.sum(X ** 2 - 10. * np.cos(2. * np.pi * X), axis=1))
+
+
+def ackley(X):
+    X = np.asarray(X)
+    return (-20. * np.exp(-0.2 * np.sqrt(np.mean(X ** 2, axis=1)))
+            - np.exp(np.mean(np.cos(2. * np.pi * X), axis=1)) + 20. + np.e)
+
+
+def griewank(X):
+    X = np.asarray(X)
+    i = np.arange(1, X.shape[1] + 1)
+    return (1. + np.sum(X ** 2, axis=1) / 4000.
+            - np.prod(np.cos(X / np.sqrt(i)), axis=1))
+
+
+def schwefel(X):
+    X = np.asarray(X)
+    return (418.9828872724338 * X.shape[1]
+            - np.sum(X * np.sin(np.sqrt(np.abs(X))), axis=1))
+
+
+FUNCTIONS = {
+    'sphere': TestFunction('sphere', sphere, -5.12, 5.12, 0.),
+    'rosenbrock': TestFunction('rosenbrock', rosenbrock, -5., 10., 0.),
+    'rastrigin': TestFunction('rastrigin', rastrigin, -5.12, 5.12, 0.),
+    'ackley': TestFunction('ackley', ackley, -32.768, 32.768, 0.),
+    'griewank': TestFunction('griewank', griewank, -600., 600., 0.),
+    'schwefel': TestFunction('schwefel', schwefel, -500., 500., 0.),
+}
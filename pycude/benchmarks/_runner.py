@@ -0,0 +1,265 @@
+"""
+Runner of the benchmarks, reporting the throughput and the time and the
+number of function evaluations to reach a target, of `differential_evolution`
+and of `scipy.optimize.differential_evolution`.
+"""
+from __future__ import division, print_function, absolute_import
+import inspect
+import json
+from timeit import default_timer
+
+import numpy as np
+from scipy import optimize
+from scipy.optimize._differentialevolution import (
+    DifferentialEvolutionSolver as _ScipySolver)
+
+from .._differentialevolution import (differential_evolution,
+                                      DifferentialEvolutionSolver)
+from ._functions import FUNCTIONS
+
+__all__ = ['run_benchmarks', 'format_report', 'compare_reports']
+
+STRATEGIES = sorted(list(DifferentialEvolutionSolver._binomial) +
+                    list(DifferentialEvolutionSolver._exponential))
+
+_SCIPY_VECTORIZED = ('vectorized' in
+                     inspect.signature(optimize.differential_evolution).parameters)
+
+
+class _Recorder(object):
+    """
+    Wraps a vectorized test function, counting the evaluations, the time
+    spent in it, and the evaluations and time at which an energy within
+    `target` of `minimum` was first reached.
+    """
+    def __init__(self, func, minimum, target):
+        self.func = func
+        self.threshold = minimum + target
+        self.nfev = 0
+        self.eval_time = 0.
+        self.nfev_to_target = None
+        self.time_to_target = None
+        self.start = default_timer()
+
+    def __call__(self, X):
+        start = default_timer()
+        energies = self.func(X)
+        self.eval_time += default_timer() - start
+        self.nfev += len(energies)
+
+        if self.nfev_to_target is None:
+            reached = np.flatnonzero(energies <= self.threshold)
+            if len(reached):
+                self.nfev_to_target = int(self.nfev - len(energies)
+                                          + reached[0] + 1)
+                self.time_to_target = default_timer() - self.start
+        return energies
+
+
+def _scipy_func(recorder):
+    """
+    adapt a recorder to the calling convention of scipy.
+    """
+    if _SCIPY_VECTORIZED:
+        # scipy passes the candidates as the columns of ``x``.
+        return lambda x: recorder(np.atleast_2d(x.T))
+    return lambda x: recorder(x[np.newaxis, :])[0]
+
+
+def _run(name, dimension, strategy, solver, target, maxiter, seed, repeats):
+    """
+    the record of the fastest of `repeats` identical runs, the others being
+    slowed down by the noise of the host.
+    """
+    records = [_run_once(name, dimension, strategy, solver, target, maxiter,
+                         seed) for _ in range(repeats)]
+    return min(records, key=lambda record: record['time'])
+
+
+def _run_once(name, dimension, strategy, solver, target, maxiter, seed):
+    function = FUNCTIONS[name]
+    bounds = [(function.lower, function.upper)] * dimension
+    recorder = _Recorder(function.func, function.minimum, target)
+
+    start = default_timer()
+    if solver == 'pycude':
+        result = differential_evolution(recorder, bounds, strategy=strategy,
+                                        maxiter=maxiter, seed=seed,
+                                        backend='numpy', layout='matrix')
+    else:
+        kwargs = dict(vectorized=True, updating='deferred') \
+            if _SCIPY_VECTORIZED else {}
+        result = optimize.differential_evolution(
+            _scipy_func(recorder), bounds, strategy=strategy, maxiter=maxiter,
+            seed=seed, polish=False, **kwargs)
+    elapsed = default_timer() - start
+
+    return dict(function=name, dimension=dimension, strategy=strategy,
+                solver=solver, fun=float(result.fun), nfev=recorder.nfev,
+                time=elapsed,
+                evals_per_sec=recorder.nfev / elapsed,
+                host_overhead=1. - recorder.eval_time / elapsed,
+                nfev_to_target=recorder.nfev_to_target,
+                time_to_target=recorder.time_to_target)
+
+
+def run_benchmarks(functions=None, dimensions=(2, 10), strategies=None,
+                   target=1e-4, maxiter=1000, seed=0, compare_scipy=True,
+                   repeats=3):
+    """Runs `differential_evolution` on the test functions.
+
+    Parameters
+    ----------
+    functions : sequence of str, optional
+        The names of the test functions in `FUNCTIONS`. All of them by
+        default.
+    dimensions : sequence of int, optional
+        The numbers of parameters with which each function is minimized.
+    strategies : sequence of str, optional
+        The strategies with which each function is minimized. All of them by
+        default.
+    target : float, optional
+        The distance to the global minimum under which the target is reached.
+    maxiter : int, optional
+        The maximum number of generations of each run.
+    seed : int, optional
+        The seed of each run.
+    compare_scipy : bool, optional
+        If True, `scipy.optimize.differential_evolution` is also run, with
+        the strategies it supports.
+    repeats : int, optional
+        The number of times each run is repeated, of which the fastest is
+        reported.
+
+    Returns
+    -------
+    report : list of dict
+        One record for each run, with the keys 'function', 'dimension',
+        'strategy', 'solver' ('pycude' or 'scipy'), 'fun', 'nfev', 'time',
+        'evals_per_sec', 'host_overhead' (the fraction of the time spent
+        outside of the objective function), 'nfev_to_target' and
+        'time_to_target' (None if the target was not reached).
+    """
+    functions = functions or sorted(FUNCTIONS)
+    strategies = strategies or STRATEGIES
+    scipy_strategies = (set(_ScipySolver._binomial) |
+                        set(_ScipySolver._exponential))
+
+    report = []
+    for name in functions:
+        for dimension in dimensions:
+            for strategy in strategies:
+                report.append(_run(name, dimension, strategy, 'pycude',
+                                   target, maxiter, seed, repeats))
+                if compare_scipy and strategy in scipy_strategies:
+                    report.append(_run(name, dimension, strategy, 'scipy',
+                                       target, maxiter, seed, repeats))
+    return report
+
+
+def format_report(report):
+    """Formats the records of `run_benchmarks` as a table."""
+    header = ('%-10s %4s %-18s %-6s %10s %8s %12s %8s %10s %10s'
+              % ('function', 'dim', 'strategy', 'solver', 'fun', 'nfev',
+                 'evals/sec', 'host', 'nfev@tgt', 'time@tgt'))
+    lines = [header, '-' * len(header)]
+    for record in report:
+        lines.append(
+            '%-10s %4d %-18s %-6s %10.3g %8d %12.4g %7.1f%% %10s %10s'
+            % (record['function'], record['dimension'], record['strategy'],
+               record['solver'], record['fun'], record['nfev'],
+               record['evals_per_sec'], 100. * record['host_overhead'],
+               '-' if record['nfev_to_target'] is None
+               else record['nfev_to_target'],
+               '-' if record['time_to_target'] is None
+               else '%.3gs' % record['time_to_target']))
+    return '\n'.join(lines)
+
+
+def _throughputs(report):
+    """
+    the evaluations per second of the 'pycude' records of `report`, with
+    those of the matching 'scipy' records, or None.
+    """
+    def key(record):
+        return (record['function'], record['dimension'], record['strategy'])
+
+    scipy = dict((key(record), record['evals_per_sec']) for record in report
+                 if record['solver'] == 'scipy')
+    return dict((key(record), (record, scipy.get(key(record))))
+                for record in report if record['solver'] == 'pycude')
+
+
+def compare_reports(report, baseline, threshold=0.2):
+    """Compares the throughput of `report` against a `baseline` report.
+
+    Only the 'pycude' records are compared. Their evaluations per second are
+    divided by those of the matching 'scipy' record of the same report,
+    which cancels out the load and the speed of the host, unless either
+    report has no such record.
+
+    Returns the 'pycude' records of `report` whose throughput fell by more
+    than the fraction `threshold` from the matching record of `baseline`, as
+    ``(record, baseline_record)`` pairs.
+    """
+    baseline = _throughputs(baseline)
+    regressions = []
+    for key, (record, scipy) in sorted(_throughputs(report).items()):
+        if key not in baseline:
+            continue
+        reference, reference_scipy = baseline[key]
+        throughput = record['evals_per_sec']
+        reference_throughput = reference['evals_per_sec']
+        if scipy is not None and reference_scipy is not None:
+            throughput /= scipy
+            reference_throughput /= reference_scipy
+        if throughput < (1. - threshold) * reference_throughput:
+            regressions.append((record, reference))
+    return regressions
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='python -m pycude.benchmarks',
+        description='Benchmarks of differential_evolution on CPU.')
+    parser.add_argument('--functions', nargs='+', choices=sorted(FUNCTIONS))
+    parser.add_argument('--dimensions', nargs='+', type=int, default=[2, 10])
+    parser.add_argument('--strategies', nargs='+', choices=STRATEGIES)
+    parser.add_argument('--target', type=float, default=1e-4)
+    parser.add_argument('--maxiter', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeats', type=int, default=3,
+                        help='the number of times each run is repeated, of '
+                             'which the fastest is reported')
+    parser.add_argument('--no-scipy', action='store_true',
+                        help='do not run scipy.optimize.differential_evolution')
+    parser.add_argument('--output', help='save the report as json')
+    parser.add_argument('--baseline',
+                        help='a report saved with --output; exit with status '
+                             '1 if the throughput regressed')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='the tolerated fall in throughput, relative '
+                             'to scipy, against the baseline')
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.functions, args.dimensions, args.strategies,
+                            args.target, args.maxiter, args.seed,
+                            not args.no_scipy, args.repeats)
+    print(format_report(report))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_reports(report, json.load(f), args.threshold)
+        for record, reference in regressions:
+            print('regression: %s %dD %s %s: %.4g evals/sec (baseline %.4g)'
+                  % (record['function'], record['dimension'],
+                     record['strategy'], record['solver'],
+                     record['evals_per_sec'], reference['evals_per_sec']))
+        return 1 if regressions else 0
+    return 0
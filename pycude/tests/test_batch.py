@@ -0,0 +1,38 @@
+"""
+Many independent problems solved in the same evaluation calls.
+"""
+from __future__ import division, print_function, absolute_import
+
+import numpy as np
+import pytest
+
+from pycude import differential_evolution_batch
+from pycude._batch import BatchDifferentialEvolutionSolver
+
+
+def _shifted_sphere(x, problem):
+    # the minimum of the i-th problem is at 0.1 * i.
+    return np.sum((np.asarray(x) - 0.1 * problem[:, np.newaxis]) ** 2,
+                  axis=1)
+
+
+@pytest.mark.parametrize('init', ['latinhypercube', 'random', 'sobol',
+                                  'halton'])
+def test_independent_populations(init):
+    # each problem starts from its own population.
+    solver = BatchDifferentialEvolutionSolver(
+        _shifted_sphere, [(-1, 1)] * 3, 4, init=init, seed=1, popsize=8,
+        layout='matrix', backend='numpy')
+    blocks = solver.population.reshape(4, 8, 3)
+    for i in range(4):
+        for j in range(i):
+            assert not np.array_equal(blocks[i], blocks[j])
+
+
+def test_solve_problems():
+    result = differential_evolution_batch(
+        _shifted_sphere, [(-1, 1)] * 2, 3, seed=1, maxiter=200, tol=1e-8,
+        layout='matrix', backend='numpy')
+    assert result.x.shape == (3, 2)
+    np.testing.assert_allclose(result.x, 0.1 * np.arange(3)[:, np.newaxis]
+                               * np.ones((3, 2)), atol=1e-2)
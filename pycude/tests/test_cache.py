@@ -0,0 +1,31 @@
+"""
+The cache of the energies of evaluated parameter vectors.
+"""
+from __future__ import division, print_function, absolute_import
+
+import numpy as np
+
+from pycude._cache import _EnergyCache
+
+
+def test_nan_energies_are_hits():
+    cache = _EnergyCache(0, 10)
+    parameters = np.array([[0., 1.], [2., 3.]])
+    keys = cache.keys(parameters)
+    cache.update(keys, np.array([np.nan, 1.]))
+
+    energies, found = cache.lookup(cache.keys(np.array([[0., 1.], [4., 5.],
+                                                        [2., 3.]])))
+    np.testing.assert_array_equal(found, [True, False, True])
+    assert np.isnan(energies[0]) and energies[2] == 1.
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_tolerance_and_eviction():
+    cache = _EnergyCache(0.1, 2)
+    cache.update(cache.keys(np.array([[0.], [1.], [2.]])),
+                 np.array([0., 1., 2.]))
+    energies, found = cache.lookup(cache.keys(np.array([[0.], [1.02],
+                                                        [2.]])))
+    np.testing.assert_array_equal(found, [False, True, True])
+    np.testing.assert_array_equal(energies[found], [1., 2.])
@@ -0,0 +1,45 @@
+"""
+Resuming the minimization from its checkpoints.
+"""
+from __future__ import division, print_function, absolute_import
+import shutil
+
+import numpy as np
+import pytest
+
+from pycude import differential_evolution
+
+
+def _rastrigin(x):
+    x = np.asarray(x)
+    return 10 * x.shape[1] + np.sum(x ** 2 - 10 * np.cos(2 * np.pi * x),
+                                    axis=1)
+
+
+@pytest.mark.parametrize('options', [{}, {'pipeline': True},
+                                     {'max_batch': 7}])
+def test_resume_with_restarts(tmpdir, options):
+    # the resumed minimization matches the uninterrupted one from every
+    # generation, including those after which it restarts.
+    bounds = [(-5.12, 5.12)] * 4
+    kwargs = dict(layout='matrix', backend='numpy', seed=4, popsize=12,
+                  stagnation=3, restarts=3, **options)
+    path = str(tmpdir.join('checkpoint.npz'))
+
+    def keep(step, **kwargs):
+        shutil.copy(path, str(tmpdir.join('checkpoint%d.npz' % step)))
+
+    full = differential_evolution(_rastrigin, bounds, checkpoint_path=path,
+                                  checkpoint_every=1, callbacks=keep,
+                                  **kwargs)
+    assert full.nrestarts == 3
+
+    for step in range(1, full.nit):
+        resumed = differential_evolution(
+            _rastrigin, bounds,
+            resume=str(tmpdir.join('checkpoint%d.npz' % step)), **kwargs)
+        assert resumed.fun == full.fun
+        assert resumed.nfev == full.nfev
+        assert resumed.nit == full.nit
+        assert resumed.nrestarts == full.nrestarts
+        np.testing.assert_array_equal(resumed.x, full.x)
@@ -0,0 +1,157 @@
+"""
+The stops, the constraints and the integer parameters of
+`differential_evolution`.
+"""
+from __future__ import division, print_function, absolute_import
+
+import numpy as np
+import pytest
+
+from pycude import differential_evolution, DifferentialEvolutionSolver
+
+_OPTIONS = dict(layout='matrix', backend='numpy', seed=1, polish=False)
+
+
+def _sphere(x):
+    return np.sum(np.asarray(x) ** 2, axis=1)
+
+
+@pytest.mark.parametrize('options', [{}, {'pipeline': True},
+                                     {'max_batch': 7},
+                                     {'init': 'opposition'},
+                                     {'restarts': 3, 'stagnation': 2}])
+@pytest.mark.parametrize('max_nfev', [20, 500])
+def test_max_nfev(options, max_nfev):
+    # the trials past the budget are not evaluated.
+    calls = []
+
+    def func(x):
+        calls.append(len(x))
+        return _sphere(x)
+
+    result = differential_evolution(func, [(-1, 1)] * 3, maxiter=1000,
+                                    tol=0, max_nfev=max_nfev,
+                                    **dict(_OPTIONS, **options))
+    assert result.nfev == sum(calls) == max_nfev
+    assert not result.success
+    assert result.message == ('Maximum number of function evaluations has '
+                              'been exceeded.')
+    assert np.isfinite(result.fun)
+
+
+def test_target():
+    result = differential_evolution(_sphere, [(-1, 1)] * 3, maxiter=1000,
+                                    target=1e-4, **_OPTIONS)
+    assert result.success
+    assert result.message == 'The target energy has been reached.'
+    assert result.fun <= 1e-4
+
+
+def _plateau(x):
+    # no solution improves on the first one with a negative parameter.
+    return 1. + (np.asarray(x)[:, 0] > 0)
+
+
+def test_stagnation():
+    result = differential_evolution(_plateau, [(-1, 1)] * 2, maxiter=1000,
+                                    tol=0, stagnation=5, **_OPTIONS)
+    assert result.success
+    assert result.message == ('The best solution has not improved for 5 '
+                              'generations.')
+    assert result.fun == 1.
+    assert result.nit == 5
+
+
+def test_stagnation_restarts():
+    result = differential_evolution(_plateau, [(-1, 1)] * 2, maxiter=1000,
+                                    tol=0, stagnation=5, restarts=2,
+                                    **_OPTIONS)
+    assert result.nrestarts == 2
+    assert result.nit == 15
+
+
+def _halfspace(x):
+    # feasible where the first parameter is at least 0.5.
+    return 0.5 - np.asarray(x)[:, 0]
+
+
+def test_constraints():
+    result = differential_evolution(_sphere, [(-1, 1)] * 3, maxiter=1000,
+                                    constraints=_halfspace, **_OPTIONS)
+    assert result.success
+    assert result.constr_violation == 0
+    np.testing.assert_allclose(result.x, [0.5, 0, 0], atol=1e-2)
+
+
+def test_constraints_screen_trials():
+    # once the population is feasible, the infeasible trials are discarded
+    # without being evaluated.
+    solver = DifferentialEvolutionSolver(_sphere, [(-1, 1)] * 3, maxiter=100,
+                                         constraints=_halfspace, **_OPTIONS)
+    nfev = 0
+    screened = 0
+    while True:
+        # the violations are known once the population is evaluated.
+        feasible = (np.all(np.isfinite(solver.population_energies))
+                    and not np.any(solver.population_violations))
+        parameters = solver.ask()
+        if feasible:
+            assert np.all(_halfspace(parameters) <= 0)
+            screened += solver.num_population_members - len(parameters)
+        nfev += len(parameters)
+        if solver.tell(_sphere(parameters)):
+            break
+    assert screened > 0
+    assert solver.result().nfev == nfev
+
+
+def test_constraints_infeasible():
+    # the first parameter cannot reach 2.
+    result = differential_evolution(
+        _sphere, [(-1, 1)] * 2, maxiter=20,
+        constraints=lambda x: 2 - np.asarray(x)[:, 0], **_OPTIONS)
+    assert not result.success
+    assert result.constr_violation > 0
+    np.testing.assert_allclose(result.x[0], 1, atol=1e-2)
+
+
+def _offset_sphere(x):
+    return np.sum((np.asarray(x) - [2.3, 0.7]) ** 2, axis=1)
+
+
+def test_integrality():
+    # the integer parameters are rounded, and no row is evaluated twice in
+    # the same call.
+    calls = []
+
+    def func(x):
+        x = np.asarray(x)
+        calls.append(np.array(x))
+        return _offset_sphere(x)
+
+    result = differential_evolution(func, [(-5, 5)] * 2, maxiter=1000,
+                                    integrality=[True, False], **_OPTIONS)
+    assert result.x[0] == 2
+    np.testing.assert_allclose(result.x[1], 0.7, atol=1e-3)
+    for x in calls:
+        np.testing.assert_array_equal(x[:, 0], np.round(x[:, 0]))
+        assert len(np.unique(x, axis=0)) == len(x)
+    assert result.nfev == sum(len(x) for x in calls)
+
+
+def test_integrality_skip_trials():
+    # on a grid of 25 points, many trials are identical to their parent or
+    # to another trial once rounded, and are not evaluated.
+    solver = DifferentialEvolutionSolver(_sphere, [(-2, 2)] * 2, maxiter=30,
+                                         integrality=True, **_OPTIONS)
+    skipped = 0
+    while True:
+        parameters = solver.ask()
+        np.testing.assert_array_equal(parameters, np.round(parameters))
+        skipped += solver.num_population_members - len(parameters)
+        if solver.tell(_sphere(parameters)):
+            break
+    assert skipped > 0
+    result = solver.result()
+    assert result.fun == 0
+    np.testing.assert_array_equal(result.x, [0, 0])
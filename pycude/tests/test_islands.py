@@ -0,0 +1,38 @@
+"""
+Differential evolution of several populations with migrations.
+"""
+from __future__ import division, print_function, absolute_import
+
+import numpy as np
+
+from pycude import differential_evolution_islands
+
+
+def _rastrigin(x):
+    x = np.asarray(x)
+    return 10 * x.shape[1] + np.sum(x ** 2 - 10 * np.cos(2 * np.pi * x),
+                                    axis=1)
+
+
+def test_resume_after_migration(tmpdir):
+    # the islands resumed from the checkpoints of a migration generation
+    # match the uninterrupted minimization.
+    bounds = [(-5.12, 5.12)] * 3
+    kwargs = dict(n_islands=2, migration_interval=3, seed=2, popsize=10,
+                  tol=0, polish=False, layout='matrix', backend='numpy')
+    path = str(tmpdir.join('checkpoint.npz'))
+
+    full = differential_evolution_islands(_rastrigin, bounds, maxiter=9,
+                                          **kwargs)
+    differential_evolution_islands(_rastrigin, bounds, maxiter=3,
+                                   checkpoint_path=path, checkpoint_every=3,
+                                   **kwargs)
+    assert tmpdir.join('checkpoint.0.npz').check()
+    assert tmpdir.join('checkpoint.1.npz').check()
+
+    resumed = differential_evolution_islands(_rastrigin, bounds, maxiter=9,
+                                             resume=path, **kwargs)
+    for island, resumed_island in zip(full.islands, resumed.islands):
+        assert resumed_island.nfev == island.nfev
+        assert resumed_island.fun == island.fun
+        np.testing.assert_array_equal(resumed_island.x, island.x)
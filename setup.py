@@ -62,8 +62,12 @@ if __name__ == "__main__":
         maintainer = MAINTAINER,
         maintainer_email = MAINTAINER_EMAIL,
         packages=PACKAGES,
+        python_requires='>=3.8',
         install_requires=[
-            'scipy >= 1.1.0',
-            'pycuda >= 2018.1'
-        ]
+            'numpy >= 1.17',
+            'scipy >= 1.1.0'
+        ],
+        extras_require={
+            'cuda': ['pycuda >= 2018.1']
+        }
     )